@@ -0,0 +1,153 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import io
+import os
+
+from pathlib import Path
+from PIL import Image, ImageOps
+
+# [색공간] ICC 프로파일 변환 (littlecms 미포함 빌드에서는 단순 모드 변환만 수행)
+try:
+    from PIL import ImageCms
+    SRGB_PROFILE = ImageCms.createProfile("sRGB")
+except ImportError:
+    ImageCms = None
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+# 정규화 방식 버전 (출력 규칙이 바뀌면 올려서 기존 캐시 항목 무효화)
+NORMALIZE_VERSION = 2
+
+WORKERS         = int(os.environ.get("IMAGE_NORMALIZE_WORKERS", min(4, os.cpu_count() or 1)))
+THUMB_SIZE      = (480, 270)    # 타임라인 표시용 썸네일 최대 크기
+JPEG_QUALITY    = 90
+BG_COLOR        = (0, 0, 0)     # 투명 영역 합성 배경 (영상 배경색과 동일)
+
+# 사진류는 JPEG, 그 외(스크린샷/도표 등 선명한 경계)는 PNG로 저장
+PHOTO_FORMATS   = {"JPEG", "MPO", "WEBP", "HEIF", "TIFF"}
+
+# 출력 형식별 변형 이미지 파일명 구분자: <stem>@<tag><ext> (예: img_01@9x16.jpg)
+VARIANT_SEP     = "@"
+
+
+
+# ===================================================================================================================
+# fit_size: 이미지 영역(box)에 비율 유지하여 맞춘 크기 (확대는 하지 않음)
+# ===================================================================================================================
+
+def fit_size(size, box):
+    w, h   = size
+    bw, bh = box
+    scale  = min(1.0, bw / w, bh / h)
+    # 렌더링 시 build_slide_clip과 같은 기준(넓은 쪽 변을 영역에 맞춤)으로 반올림
+    if scale < 1.0:
+        return (bw, max(1, round(h * bw / w))) if w * bh > h * bw else (max(1, round(w * bh / h)), bh)
+    return w, h
+
+
+# ===================================================================================================================
+# 출력 형식별 변형 이미지 경로
+# - 기본 출력 형식(첫 번째)은 원래 경로, 나머지는 <stem>@<tag><ext> (크기가 같으면 생략)
+# - 캐시/프로젝트 저장소는 기본 이미지와 함께 변형 파일을 옮김
+# ===================================================================================================================
+
+def variant_tag(fmt):
+    return fmt.replace(":", "x")
+
+
+def variant_path(path, tag):
+    path = Path(path)
+    return path.with_name(f"{path.stem}{VARIANT_SEP}{tag}{path.suffix}")
+
+
+def variant_files(path):
+    path = Path(path)
+    return {
+        f.stem.rsplit(VARIANT_SEP, 1)[1]: f
+        for f in path.parent.glob(f"{path.stem}{VARIANT_SEP}*{path.suffix}")
+    }
+
+
+def format_image(path, fmt):
+    variant = variant_path(path, variant_tag(fmt))
+    return variant if variant.exists() else Path(path)
+
+
+# ===================================================================================================================
+# to_srgb: 내장 ICC 프로파일(Adobe RGB, CMYK 인쇄용 등)이 있으면 sRGB로 변환
+# ===================================================================================================================
+
+def to_srgb(img):
+    icc = img.info.get("icc_profile")
+    if ImageCms is None or not icc or img.mode not in ("RGB", "CMYK", "L"):
+        return img
+    try:
+        profile = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+        return ImageCms.profileToProfile(img, profile, SRGB_PROFILE, outputMode="RGB")
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return img
+
+
+# ===================================================================================================================
+# normalize_image: 업로드 이미지 1장 정규화 (스레드 풀 작업 단위)
+# - EXIF 방향 적용 → sRGB/RGB 변환 (투명 영역은 배경색 합성) → 출력 형식별 이미지 영역 크기로 1회 축소 → 썸네일 생성
+# - boxes: {출력 형식: 이미지 영역} - 첫 번째 형식이 기본 이미지, 크기가 다른 형식만 변형 파일로 저장
+#   (렌더링 시 영역과 크기가 정확히 같으므로 리사이즈 없이 사용)
+# - JPEG는 draft 모드로 축소 디코딩하여 대형 사진도 원본 해상도 전체를 펼치지 않음
+# - 반환: (기본 이미지 경로, 썸네일 경로)
+# ===================================================================================================================
+
+def normalize_image(data, dest_dir, stem, boxes):
+    with Image.open(io.BytesIO(data)) as src:
+        fmt = src.format
+
+        # EXIF 회전(90/270도)이면 가로/세로가 바뀌므로 방향 적용 후 크기 기준으로 계산
+        orientation = src.getexif().get(0x0112, 1)
+        w, h        = src.size
+        if orientation in (5, 6, 7, 8):
+            w, h = h, w
+        targets = {name: fit_size((w, h), box) for name, box in boxes.items()}
+        largest = max(tw for tw, _ in targets.values())
+        if fmt == "JPEG" and largest < w:
+            scale = largest / w
+            src.draft("RGB", (max(1, int(src.width * scale)), max(1, int(src.height * scale))))
+
+        img = to_srgb(ImageOps.exif_transpose(src))
+        if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            img  = Image.new("RGB", rgba.size, BG_COLOR)
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            img = img.convert("RGB")
+
+    dest_dir = Path(dest_dir)
+    ext      = ".jpg" if fmt in PHOTO_FORMATS else ".png"
+    out_path = dest_dir / f"{stem}{ext}"
+    names    = list(targets)
+    for i, name in enumerate(names):
+        target = targets[name]
+        if i and target == targets[names[0]]:
+            continue
+        resized = img if img.size == target else img.resize(target, Image.LANCZOS)
+        path    = out_path if i == 0 else variant_path(out_path, variant_tag(name))
+        if ext == ".jpg":
+            resized.save(path, quality=JPEG_QUALITY, optimize=True)
+        else:
+            resized.save(path, optimize=True)
+        if i == 0:
+            thumb = resized.copy()
+
+    thumb_path = dest_dir / f"{stem}_thumb.jpg"
+    thumb.thumbnail(THUMB_SIZE)
+    thumb.save(thumb_path, quality=85)
+    return out_path, thumb_path
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
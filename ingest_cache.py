@@ -0,0 +1,191 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+from pathlib import Path
+from PIL import Image
+
+# 출력 형식별 변형 이미지 (<stem>@<tag><ext>)는 기본 이미지와 함께 저장/복원
+from image_normalizer import variant_path, variant_files
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+# 캐시 포맷 버전 (저장 구조가 바뀌면 올려서 기존 항목 무효화)
+CACHE_VERSION   = 1
+
+# 용량 / 보관 기간 한도
+MAX_BYTES       = int(os.environ.get("INGEST_CACHE_MAX_MB", "2048")) * 1024 * 1024
+MAX_AGE_SEC     = int(os.environ.get("INGEST_CACHE_MAX_AGE_DAYS", "14")) * 24 * 3600
+
+THUMB_SIZE      = (480, 270)    # 타임라인 표시용 썸네일 최대 크기
+MANIFEST_NAME   = "manifest.json"
+
+
+
+# ===================================================================================================================
+# make_key: 문서 내용 해시 + 렌더링 파라미터로 캐시 키 생성
+# - 같은 파일이라도 DPI, 렌더러 등이 다르면 다른 키
+# ===================================================================================================================
+
+def make_key(data, **params):
+    h = hashlib.sha256()
+    h.update(data)
+    h.update(json.dumps({"v": CACHE_VERSION, **params}, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+# ===================================================================================================================
+# _copy_file: 캐시 파일을 작업 디렉토리로 복사
+# - 하드링크는 작업 디렉토리에서 파일을 수정하면 캐시 원본까지 바뀌므로 항상 복사
+# - 기존 파일은 먼저 삭제 (이전 버전이 만든 하드링크를 통해 캐시에 덮어쓰지 않도록)
+# ===================================================================================================================
+
+def _copy_file(src, dst):
+    dst = Path(dst)
+    if dst.exists():
+        dst.unlink()
+    shutil.copy2(src, dst)
+    return dst
+
+
+# ===================================================================================================================
+# IngestCache: 업로드 문서 처리 결과 캐시
+# - 항목 구조: <root>/<key>/{p01.png, p01@9x16.png, t01.jpg, ..., manifest.json}
+# - manifest.json은 마지막에 기록 → manifest가 있는 항목만 유효
+# - manifest의 mtime을 마지막 사용 시각으로 사용 (LRU / 기간 만료 판단)
+# ===================================================================================================================
+
+class IngestCache:
+    def __init__(self, root, max_bytes=MAX_BYTES, max_age=MAX_AGE_SEC):
+        self.root      = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age   = max_age
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # get: 캐시 조회 → 작업 디렉토리로 페이지/썸네일 복사
+    # - 반환: [{'path', 'thumb', 'text'}, ...] 또는 None (미스)
+    # ─────────────────────────────────────────────────────────────────────────
+    def get(self, key, dest_dir, prefix):
+        entry    = self.root / key
+        manifest = entry / MANIFEST_NAME
+        if not manifest.exists():
+            return None
+
+        try:
+            with open(manifest, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            pages = []
+            for i, page in enumerate(meta["pages"]):
+                path  = _copy_file(entry / page["file"], Path(dest_dir) / f"{prefix}_p{i+1:02d}{Path(page['file']).suffix}")
+                thumb = _copy_file(entry / page["thumb"], Path(dest_dir) / f"{prefix}_t{i+1:02d}.jpg")
+                for tag, name in page.get("variants", {}).items():
+                    _copy_file(entry / name, variant_path(path, tag))
+                pages.append({'path': path, 'thumb': thumb, 'text': page.get("text", "")})
+        except (OSError, KeyError, ValueError):
+            # 손상된 항목은 버리고 미스로 처리
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        os.utime(manifest)
+        return pages
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # put: 처리 결과 저장 + 썸네일 생성
+    # - 입력 pages: [{'path', 'text'}, ...] ('thumb'이 이미 있으면 재사용)
+    # - 반환: 각 페이지에 'thumb'(작업 디렉토리 경로)를 채운 pages
+    # - 임시 디렉토리는 호출마다 고유 (같은 프로세스의 여러 세션이 같은 문서를 동시에 저장해도 충돌 없음)
+    # ─────────────────────────────────────────────────────────────────────────
+    def put(self, key, pages, dest_dir, prefix):
+        entry = self.root / key
+        tmp   = Path(tempfile.mkdtemp(prefix=f".{key}.", suffix=".tmp", dir=self.root))
+        try:
+            self._write_entry(tmp, pages, dest_dir, prefix)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # 그 사이 다른 세션이 같은 항목을 저장했으면 그 항목을 그대로 사용
+                if not (entry / MANIFEST_NAME).exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        return pages
+
+    # _write_entry: 임시 디렉토리에 페이지/변형/썸네일 + manifest 기록
+    def _write_entry(self, tmp, pages, dest_dir, prefix):
+        meta  = {"version": CACHE_VERSION, "created": time.time(), "pages": []}
+        total = 0
+        for i, page in enumerate(pages):
+            src        = Path(page['path'])
+            page_name  = f"p{i+1:02d}{src.suffix}"
+            thumb_name = f"t{i+1:02d}.jpg"
+
+            shutil.copy2(src, tmp / page_name)
+            variants = {}
+            for tag, f in variant_files(src).items():
+                variants[tag] = variant_path(page_name, tag).name
+                shutil.copy2(f, tmp / variants[tag])
+                total += f.stat().st_size
+            if page.get('thumb'):
+                shutil.copy2(page['thumb'], tmp / thumb_name)
+            else:
+                with Image.open(src) as img:
+                    img = img.convert("RGB")
+                    img.thumbnail(THUMB_SIZE)
+                    img.save(tmp / thumb_name, quality=85)
+
+            page['thumb'] = _copy_file(tmp / thumb_name, Path(dest_dir) / f"{prefix}_t{i+1:02d}.jpg")
+            total += (tmp / page_name).stat().st_size + (tmp / thumb_name).stat().st_size
+            meta["pages"].append({"file": page_name, "thumb": thumb_name, "text": page.get('text', ""), "variants": variants})
+
+        meta["bytes"] = total
+        with open(tmp / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # evict: 기간 만료 항목 삭제 후, 용량 초과 시 오래 안 쓴 순서로 삭제
+    # ─────────────────────────────────────────────────────────────────────────
+    def evict(self):
+        now     = time.time()
+        entries = []
+        for entry in self.root.iterdir():
+            manifest = entry / MANIFEST_NAME
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            if not manifest.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            last_used = manifest.stat().st_mtime
+            if now - last_used > self.max_age:
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    size = json.load(f).get("bytes", 0)
+            except (OSError, ValueError):
+                size = 0
+            entries.append((last_used, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
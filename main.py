@@ -2,18 +2,20 @@
 # 1. Import & Library
 # -----------------------------------------------------------------------------------------------------------------------------#
 # [OS/시스템] 파일 처리, 비동기, JSON 파싱, 정규식, 로깅
-import os, asyncio, json, time, shutil, fitz, re, logging
+import os, json, time, shutil, fitz, re, logging
 
 # [UI] Streamlit 웹 인터페이스
 import streamlit as st
 
-# [TTS] Microsoft Edge TTS - 텍스트를 음성으로 변환
-import edge_tts
-
 # [유틸] 경로 처리 및 시간
 from pathlib import Path
 from datetime import datetime
 
+# [병렬] 슬라이드별 세그먼트 인코딩 프로세스 풀
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
 # [이미지] PIL - 이미지 처리 (moviepy 호환성 패치 포함)
 from PIL import Image, ImageDraw, ImageFont
 if not hasattr(Image, 'ANTIALIAS'):
@@ -24,11 +26,40 @@ from pptx import Presentation
 import io
 
 # [영상처리] MoviePy - 이미지/오디오를 영상으로 합성
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, TextClip, CompositeVideoClip, ColorClip
+from moviepy.editor import AudioFileClip, concatenate_videoclips
+
+# [영상처리] 슬라이드 합성 공통 모듈 (렌더 워커와 공유)
+# - TTS(Qwen3-TTS / Edge-TTS 대체), 자막 타이밍, 레이어 합성, 세그먼트 인코딩
+from slide_composer import CANVAS_SIZE, FONT_PATH, OUTPUT_FORMATS, subtitle_timing, load_format_images, build_slide_clip
+import slide_composer
 
 # [외부API] YouTube 업로드 매니저, Google Gemini AI
 import youtube_manager
 
+# [PPT] 상주 LibreOffice 변환 워커 풀
+import ppt_converter
+
+# [캐시] 업로드 문서 처리 결과 캐시 (내용 해시 기반)
+import ingest_cache
+
+# [영상처리] 슬라이드 단위 스트리밍 인코더 (긴 문서용)
+import stream_renderer
+
+# [AI] Gemini 배치 대본 생성기
+import script_generator
+
+# [저장] 프로젝트 영속 저장소 (SQLite)
+import project_store
+
+# [운영] 렌더링 비용 모델 (ETA 예측 + 수용 제어)
+import render_cost
+
+# [이미지] 업로드 이미지 정규화 (EXIF 방향, 색공간, 렌더링 해상도 축소, 썸네일)
+import image_normalizer
+
+# [운영] 분산 렌더링 브로커 (슬라이드 단위 작업을 여러 호스트의 워커에 배분)
+import render_broker
+
 # [TTS] Qwen3-TTS Manager
 try:
     from tts_manager import TTSEngine
@@ -72,12 +103,8 @@ PROJECT_NAME   = "DocuMotion Studio"
 
 st.set_page_config(page_title=PROJECT_NAME, page_icon="🎬", layout="wide")
 
-# [영상 렌더링 설정] 캔버스 크기, 폰트, 자막 스타일
-CANVAS_SIZE    = (1280, 720)             # 720p HD 해상도
-FONT_PATH      = "font.ttf"              # 자막용 폰트 파일 경로
-FONT_SIZE      = 28                      # 자막 폰트 크기 (px)
-TEXT_COLOR     = 'white'                 # 자막 텍스트 색상
-BG_COLOR       = (0, 0, 0)               # 배경색 (검정)
+# [영상 렌더링 설정] 캔버스 크기, 폰트, 자막 스타일, 출력 형식은 slide_composer.py 참고
+STREAMING_AUTO = 30                      # 슬라이드 수가 이 값을 넘으면 스트리밍 렌더링 기본 선택
 YT_DESCRIPTION = """AI 기반으로 제작된 자동 생성 영상입니다.
 
 📌 Summary
@@ -110,9 +137,12 @@ except Exception as e:
 BASE_DIR     = Path(__file__).parent
 TEMP_DIR     = BASE_DIR / "temp"          # TTS 오디오, 추출된 이미지 저장
 OUTPUT_DIR   = BASE_DIR / "outputs"       # 최종 렌더링된 영상 저장
+CACHE_DIR    = BASE_DIR / "cache"         # 업로드 문서 처리 결과 캐시 (클렌징 대상 아님)
+PROJECT_DIR  = BASE_DIR / "projects"      # 프로젝트 DB 및 슬라이드 자산 (클렌징 대상 아님)
+STATS_DIR    = BASE_DIR / "stats"         # 렌더링 단계별 소요 시간 이력 (비용 모델 학습용)
 
 # 디렉토리 자동 생성
-for folder in [TEMP_DIR, OUTPUT_DIR]: folder.mkdir(parents=True, exist_ok=True)
+for folder in [TEMP_DIR, OUTPUT_DIR, CACHE_DIR, PROJECT_DIR, STATS_DIR]: folder.mkdir(parents=True, exist_ok=True)
 
 
 
@@ -124,6 +154,7 @@ for folder in [TEMP_DIR, OUTPUT_DIR]: folder.mkdir(parents=True, exist_ok=True)
 # clear_work_directories: 작업 디렉토리 초기화
 # - temp/, outputs/ 폴더 내 모든 파일/폴더 삭제
 # - 새 프로젝트 시작 또는 수동 클렌징 시 호출
+# - cache/ 는 유지 (같은 문서 재업로드 시 재사용)
 # ─────────────────────────────────────────────────────────────────────────────
 def clear_work_directories():
     for folder in [TEMP_DIR, OUTPUT_DIR]:
@@ -215,15 +246,6 @@ def get_upload_status(video_name):
 def sanitize_filename(name):
     return re.sub(r'[<>:"/\\|?*]', '_', name)[:50]
 
-# ─────────────────────────────────────────────────────────────────────────────
-# split_sentences: 텍스트를 문장 단위로 분리
-# - 정규식: 마침표/느낌표/물음표 뒤 공백 기준 분할
-# - 자막 타이밍 계산에 사용 (문장별 표시 시간 산출)
-# ─────────────────────────────────────────────────────────────────────────────
-def split_sentences(text):
-    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-    return [s for s in sentences if s]
-
 # ─────────────────────────────────────────────────────────────────────────────
 # create_image_from_text: 텍스트로 단순 슬라이드 이미지 생성 (PPT 대용)
 # - LibreOffice 부재로 PPT 렌더링 불가 시 대안
@@ -251,26 +273,75 @@ def create_image_from_text(text, filename, size=CANVAS_SIZE):
         
     img.save(filename)
 
+# ─────────────────────────────────────────────────────────────────────────────
+# load_ppt_converter: PPT 변환 워커 풀 로드 (캐싱 적용)
+# - 서버 프로세스당 1회만 LibreOffice 워커를 기동하여 재사용
+# - 변환기가 없으면 None 반환 → 텍스트 모드로 대체
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_ppt_converter():
+    try:
+        pool = ppt_converter.ConverterPool()
+        return pool if pool.start() else None
+    except Exception as e:
+        logger.error(f"PPT Converter Load Error: {e}")
+        return None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# load_ingest_cache: 업로드 문서 캐시 로드 (캐싱 적용)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_ingest_cache():
+    return ingest_cache.IngestCache(CACHE_DIR / "ingest")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# load_script_generator: Gemini 대본 생성기 로드 (캐싱 적용)
+# - GEMINI_BASE_URL 환경변수로 로컬 스텁 서버 지정 가능
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_script_generator():
+    try:
+        return script_generator.ScriptGenerator(GOOGLE_API_KEY, CACHE_DIR / "scripts")
+    except Exception as e:
+        logger.error(f"Script Generator Load Error: {e}")
+        return None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# extract_pptx_texts: 슬라이드별 텍스트 추출 (python-pptx)
+# - .ppt 등 python-pptx가 열 수 없는 파일은 빈 리스트 반환
+# ─────────────────────────────────────────────────────────────────────────────
+def extract_pptx_texts(file_stream):
+    try:
+        prs = Presentation(file_stream)
+    except Exception:
+        return []
+
+    texts = []
+    for slide in prs.slides:
+        text_runs = [shape.text for shape in slide.shapes if hasattr(shape, "text")]
+        texts.append("\n".join(text_runs).strip())
+    return texts
+
 # ─────────────────────────────────────────────────────────────────────────────
 # process_pptx: PPT 파일 처리
-# - 각 슬라이드의 텍스트 추출 -> 이미지 변환
+# - rendered_pages가 있으면 LibreOffice로 렌더링한 슬라이드 이미지 사용
+# - 없으면 각 슬라이드의 텍스트 추출 -> 이미지 변환 (텍스트 모드 대체)
 # ─────────────────────────────────────────────────────────────────────────────
-def process_pptx(file_stream, temp_dir):
-    prs = Presentation(file_stream)
+def process_pptx(file_stream, temp_dir, safe_base="ppt", rendered_pages=None):
+    texts  = extract_pptx_texts(file_stream)
     assets = []
-    
-    for i, slide in enumerate(prs.slides):
-        # 텍스트 추출
-        text_runs = []
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                text_runs.append(shape.text)
-        
-        slide_text = "\n".join(text_runs).strip()
+
+    if rendered_pages:
+        for i, page in enumerate(rendered_pages):
+            slide_text = texts[i] if i < len(texts) else ""
+            assets.append({'path': page, 'label': f"PPT Slide {i+1}", 'extracted_text': slide_text})
+        return assets
+
+    for i, slide_text in enumerate(texts):
         if not slide_text: slide_text = f"Slide {i+1} (No Text)"
         
         # 이미지 생성 (TEXT -> PNG)
-        target = temp_dir / f"ppt_{i+1:02d}.png"
+        target = temp_dir / f"ppt_{safe_base}_{i+1:02d}.png"
         create_image_from_text(slide_text, str(target))
         assets.append({'path': target, 'label': f"PPT Slide {i+1}", 'extracted_text': slide_text})
         
@@ -292,6 +363,49 @@ def delete_slide(idx):
     del st.session_state.master_slides[idx]
     st.rerun()
 
+# ─────────────────────────────────────────────────────────────────────────────
+# load_project_store: 프로젝트 저장소 로드 (캐싱 적용)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_project_store():
+    return project_store.ProjectStore(PROJECT_DIR)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# autosave_project: 현재 슬라이드 상태를 프로젝트에 증분 저장
+# - 매 rerun 마지막에 호출 (바뀐 슬라이드만 기록)
+# - 프로젝트가 없으면 새로 생성
+# ─────────────────────────────────────────────────────────────────────────────
+def autosave_project():
+    slides = st.session_state.get('master_slides')
+    if not slides: return
+    store = load_project_store()
+    try:
+        if 'project_id' not in st.session_state:
+            st.session_state.project_id = store.create_project(f"{PROJECT_NAME} {datetime.now().strftime('%m-%d %H:%M')}")
+        store.sync(st.session_state.project_id, slides)
+    except Exception as e:
+        logger.error(f"Project Autosave Error: {e}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# clear_script_widgets: 대사 위젯 키(t_i) 삭제
+# - 슬라이드 목록이 바뀔 때 이전 프로젝트의 대본이 같은 번호 위젯에 남지 않도록 함
+# ─────────────────────────────────────────────────────────────────────────────
+def clear_script_widgets():
+    for key in [k for k in st.session_state.keys() if re.fullmatch(r"t_\d+", str(k))]:
+        del st.session_state[key]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# restore_project: 저장된 프로젝트 복원 (재변환 없이 DB에서 즉시 로드)
+# - 대사 위젯 키(t_i)를 비워 복원된 대본이 표시되도록 함
+# ─────────────────────────────────────────────────────────────────────────────
+def restore_project(project_id):
+    slides = load_project_store().load(project_id)
+    clear_script_widgets()
+    st.session_state.master_slides = slides
+    st.session_state.project_id    = project_id
+    if 'last_v' in st.session_state: del st.session_state.last_v
+    st.rerun()
+
 # ─────────────────────────────────────────────────────────────────────────────
 # render_video: 슬라이드 데이터를 영상으로 렌더링
 # - 입력: [{"image": Path, "text": str}, ...] 형태의 슬라이드 리스트
@@ -301,26 +415,32 @@ def delete_slide(idx):
 #   3) 문장별 자막 클립 생성 (글자 수 비례로 표시 시간 계산)
 #   4) 배경 + 이미지 + 자막 + 오디오 합성
 #   5) 모든 슬라이드 연결 후 MP4 파일로 출력
-# - 출력: 생성된 영상 파일 경로 (실패 시 None)
-# - 진행률: 슬라이드 합성(0-50%) + 영상 인코딩(51-100%)
+# - 출력: 출력 형식별 영상 파일 경로 리스트 (formats 순서, 일괄 렌더링은 16:9 1개 / 실패 시 None)
+# - 진행률: 슬라이드 합성(0-N%) + 영상 인코딩(N-100%), N = 비용 모델의 예측 음성 합성 비중(tts_share) - 렌더링 방식별 세부는 각 함수 참고
 # ─────────────────────────────────────────────────────────────────────────────
 from proglog import ProgressBarLogger
 
 class StreamlitProgressLogger(ProgressBarLogger):
     """MoviePy 인코딩 진행률을 Streamlit 프로그레스바에 연결하는 커스텀 로거"""
-    def __init__(self, progress_bar):
+    def __init__(self, progress_bar, start_pct=50):
         super().__init__()
         self.progress_bar = progress_bar
+        self.start_pct    = start_pct
+        self.started      = None
     
     def bars_callback(self, bar, attr, value, old_value=None):
         # bar='t': 비디오 프레임 처리 진행률
         if bar == 't' and attr == 'index':
             total = self.bars[bar]['total']
             if total > 0:
-                # 인코딩 진행률: 50% ~ 100% 구간
+                # 인코딩 진행률: start_pct% ~ 100% 구간 (구간은 비용 모델의 예측 비중으로 결정)
+                if self.started is None: self.started = time.time()
                 encode_progress = int(value / total * 100)
-                overall_progress = 50 + int(encode_progress * 0.5)
-                self.progress_bar.progress(overall_progress, f"📼 영상 인코딩 중... ({encode_progress}%)")
+                overall_progress = self.start_pct + int(encode_progress * (100 - self.start_pct) / 100)
+                # 남은 시간: 인코딩 실측 속도로 외삽
+                elapsed = time.time() - self.started
+                eta = elapsed * (total - value) / value if value > 0 else 0
+                self.progress_bar.progress(overall_progress, f"📼 영상 인코딩 중... ({encode_progress}%) · 남은 시간 약 {render_cost.format_eta(eta)}")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -337,8 +457,152 @@ def load_tts_engine():
         logger.error(f"TTS Engine Load Error: {e}")
         return None
 
-def render_video(data, video_title="DocuMotion Video"):
+# ─────────────────────────────────────────────────────────────────────────────
+# load_render_stats / load_cost_model / load_admission: 렌더링 비용 모델 (캐싱 적용)
+# - 수용 제어는 서버 프로세스 전역에서 공유 (모든 세션의 렌더링 부하 합산)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_render_stats():
+    return render_cost.RenderStats(STATS_DIR)
+
+@st.cache_resource
+def load_cost_model():
+    return render_cost.CostModel(load_render_stats())
+
+@st.cache_resource
+def load_admission():
+    return render_cost.Admission()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# load_image_pool: 업로드 이미지 정규화 스레드 풀 (PIL 디코딩/리사이즈는 GIL 해제, 캐싱 적용)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_image_pool():
+    return ThreadPoolExecutor(max_workers=image_normalizer.WORKERS)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# load_segment_pool: 세그먼트 병렬 인코딩 프로세스 풀 (서버 프로세스 전역, 캐싱 적용)
+# - spawn 방식: TTS 모델이 로드된 앱 프로세스를 fork하지 않고 slide_composer만 불러옴
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_segment_pool():
+    return ProcessPoolExecutor(
+        max_workers=slide_composer.SEGMENT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+# 세그먼트 풀 작업 프로세스 PID (메모리 측정용 - 풀은 작업 제출 시 프로세스를 띄우므로 측정 시점마다 조회)
+def segment_worker_pids():
+    return list((load_segment_pool()._processes or {}).copy())
+
+# ─────────────────────────────────────────────────────────────────────────────
+# load_broker: 분산 렌더링 브로커 연결 (RENDER_BROKER_URL 설정 시, 캐싱 적용)
+# ─────────────────────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_broker():
+    if not render_broker.BROKER_URL:
+        return None
+    try:
+        return render_broker.open_broker(render_broker.BROKER_URL)
+    except Exception as e:
+        logger.error(f"Render Broker Load Error: {e}")
+        return None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# synthesize_slide_audio: 슬라이드 대사 → 오디오 파일 (Qwen3-TTS, 실패 시 Edge-TTS)
+# - 반환: 오디오 파일 생성 여부
+# ─────────────────────────────────────────────────────────────────────────────
+def synthesize_slide_audio(tts_engine, text, a_path, slide_no):
+    # Voice Cloning 적용 여부 확인
+    current_ref_audio = REF_AUDIO_PATH if os.path.exists(REF_AUDIO_PATH) else None
+    current_ref_text = REF_TEXT if current_ref_audio else None
+
+    if current_ref_audio:
+        logger.info(f"Generating with cloned voice using {current_ref_audio}")
+    
+    created, used_fallback = slide_composer.synthesize_audio(
+        tts_engine, text, a_path, current_ref_audio, current_ref_text
+    )
+    
+    if used_fallback:
+       st.warning(f"슬라이드 {slide_no} 오디오 생성 실패. 기본 TTS로 대체했습니다.")
+
+    if not created:
+         st.error(f"오디오 파일 생성 실패: {text[:20]}...")
+         return False
+    return True
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_mode: 렌더링 경로 선택 (분산 > 병렬 세그먼트 > 스트리밍 > 일괄)
+# ─────────────────────────────────────────────────────────────────────────────
+def render_mode(streaming, distributed, parallel):
+    if distributed:
+        return "remote"
+    if parallel:
+        return "segment"
+    return "stream" if streaming else "batch"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# segment_lanes: 병렬 세그먼트 렌더링의 동시 작업 수 (풀 크기와 수용 한도 중 작은 값)
+# ─────────────────────────────────────────────────────────────────────────────
+def segment_lanes(model, formats):
+    admission = load_admission()
+    return model.segment_lanes(slide_composer.SEGMENT_WORKERS, formats, admission.max_cpu, admission.max_mem_mb)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_video: 렌더링 진입점
+# - 비용 모델로 소요 시간/CPU/메모리 예측 → 수용 제어 (한도 초과 시 대기 또는 거절)
+# - 렌더링 경로 선택: 일괄 / 스트리밍(긴 문서, 다중 출력 형식) / 병렬 세그먼트(멀티코어) / 분산(워커)
+# - 완료 후 작업 단위 실측(시간, 메모리)을 이력에 기록하고 모델 재적합
+# ─────────────────────────────────────────────────────────────────────────────
+def render_video(data, video_title="DocuMotion Video", streaming=False, formats=("16:9",), distributed=False, parallel=False):
+    # 여러 출력 형식은 스트리밍/세그먼트 경로에서 한 번에 처리 (오디오/자막/이미지 공유)
+    streaming = streaming or list(formats) != ["16:9"]
+    mode      = render_mode(streaming, distributed, parallel)
+    texts     = [item['text'] for item in data]
+    model     = load_cost_model()
+    lanes     = segment_lanes(model, len(formats)) if mode == "segment" else 1
+    estimate  = model.estimate(texts, mode, len(formats), lanes)
+    
+    status = st.empty()
+    try:
+        ticket = load_admission().acquire(
+            estimate, wait_cb=lambda pos: status.info(f"🚦 서버 부하로 대기 중... (대기 순번 {pos})")
+        )
+    except render_cost.RenderRejected as e:
+        status.empty()
+        st.error(f"🚦 렌더링 거절: {e}")
+        return None
+    status.empty()
+    
+    logger.info(f"Render admitted: {estimate['slides']} slides, ETA {estimate['seconds']:.0f}s, "
+                f"CPU {estimate['cpu']:.1f}, MEM {estimate['mem_mb']:.0f}MB")
+    tracker = render_cost.RenderTracker(model, load_render_stats(), texts, mode, len(formats), lanes,
+                                        segment_worker_pids if mode == "segment" else None)
+    try:
+        if mode == "remote":
+            result = render_video_distributed(data, video_title, formats, tracker)
+        elif mode == "segment":
+            result = render_video_segments(data, video_title, formats, tracker)
+        elif streaming:
+            result = render_video_streaming(data, video_title, formats, tracker)
+        else:
+            result = render_video_batch(data, video_title, tracker)
+    finally:
+        load_admission().release(ticket)
+    
+    if result:
+        tracker.finish()
+        model.refit()
+    return result
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_video_batch: 일괄 렌더링 (전체 타임라인을 한 번에 인코딩)
+# - 진행률: 슬라이드 합성(0-N%) + 영상 인코딩(N-100%), N = 예측 음성 합성 비중
+# ─────────────────────────────────────────────────────────────────────────────
+def render_video_batch(data, video_title, tracker):
     total_slides = len(data)
+    split_pct    = max(5, min(95, int(tracker.tts_share * 100)))
     final_clips = []
     
     # 통합 프로그레스바 생성
@@ -354,98 +618,353 @@ def render_video(data, video_title="DocuMotion Video"):
         for i, item in enumerate(data):
             if not item['text']: continue
             
-            # 슬라이드 진행률: 0% ~ 50% 구간
-            slide_progress = int((i / total_slides) * 50)
-            progress_bar.progress(slide_progress, f"⏳ 슬라이드 {i+1}/{total_slides} 합성 중... ({slide_progress}%)")
+            # 슬라이드 진행률: 0% ~ split_pct% 구간
+            slide_progress = int((i / total_slides) * split_pct)
+            eta_text       = render_cost.format_eta(tracker.remaining(i))
+            progress_bar.progress(slide_progress, f"⏳ 슬라이드 {i+1}/{total_slides} 합성 중... ({slide_progress}%) · 남은 시간 약 {eta_text}")
             
             # Step 1: TTS 오디오 생성 (Qwen3-TTS)
             a_path = TEMP_DIR / f"v_{i}.wav" # wav로 변경 권장 (Qwen-TTS 출력 포맷에 따라)
-            
-            # Voice Cloning 적용 여부 확인
-            current_ref_audio = REF_AUDIO_PATH if os.path.exists(REF_AUDIO_PATH) else None
-            current_ref_text = REF_TEXT if current_ref_audio else None
-
-            if current_ref_audio:
-                logger.info(f"Generating with cloned voice using {current_ref_audio}")
-            
-            success = tts_engine.generate(
-                text=item['text'],
-                output_file=str(a_path),
-                ref_audio_path=current_ref_audio,
-                ref_text=current_ref_text
-            )
-            
-            if not success:
-               st.warning(f"슬라이드 {i+1} 오디오 생성 실패. 기본 TTS로 시도합니다.")
-               # Fallback or Skip? For now, we assume failure usually means model error.
-               # If strict logic, maybe fallback to edge-tts if installed? 
-               # But let's stick to user requirement of using Qwen.
-               # For robustness, if Qwen fails, we might just create a silent clip or error out.
-               # Let's try to fallback to Edge-TTS if Qwen fails (Safety Net)
-               try:
-                   asyncio.run(edge_tts.Communicate(item['text'], "ko-KR-SunHiNeural").save(str(a_path)))
-               except:
-                   pass
-
-            if not os.path.exists(str(a_path)):
-                 st.error(f"오디오 파일 생성 실패: {item['text'][:20]}...")
-                 continue
+            t_start = time.time()
+            if not synthesize_slide_audio(tts_engine, item['text'], a_path, i + 1):
+                continue
 
             a_clip         = AudioFileClip(str(a_path))
-            total_duration = a_clip.duration
-            
-            # Step 2: 문장 분리 및 자막 타이밍 계산 준비
-            sentences      = split_sentences(item['text'])
-            total_chars    = sum(len(s) for s in sentences)
+            tracker.record("tts", len(item['text']), time.time() - t_start)
+            tracker.record("audio", len(item['text']), a_clip.duration)
+            tracker.slide_done(i)
             
-            # Step 3: 배경(검정) 및 이미지 클립 생성
-            bg_clip        = ColorClip(size=CANVAS_SIZE, color=BG_COLOR).set_duration(total_duration)
-            img_clip       = ImageClip(str(item['image'])).resize(height=int(CANVAS_SIZE[1] * 0.85)).set_position(('center', 'top')).set_duration(total_duration)
-            
-            # Step 4: 문장별 자막 클립 생성 (글자 수 비례 타이밍)
-            subtitle_clips = []
-            current_start  = 0
-
-            for s in sentences:
-                dur          = (len(s) / total_chars) * total_duration if total_chars > 0 else total_duration
-                txt_clip     = TextClip(
-                    txt      = s, 
-                    font     = FONT_PATH, 
-                    fontsize = FONT_SIZE, 
-                    color    = TEXT_COLOR, 
-                    size     = (CANVAS_SIZE[0] - 100, None), 
-                    method   = 'caption', 
-                    align    = 'center',
-                    interline = 8
-                ).set_start(current_start).set_duration(dur).set_position(('center', CANVAS_SIZE[1] - 90))
-                subtitle_clips.append(txt_clip)
-                current_start += dur
-                
-            # Step 5: 레이어 합성 (배경 → 이미지 → 자막) + 오디오 연결
-            final_clips.append(CompositeVideoClip([bg_clip, img_clip] + subtitle_clips).set_audio(a_clip))
+            # Step 2~5: 레이어 합성 + 오디오 연결
+            slide_clip, _  = build_slide_clip(item['image'], item['text'], a_clip.duration)
+            final_clips.append(slide_clip.set_audio(a_clip))
 
-        # 슬라이드 합성 완료 (50%)
-        progress_bar.progress(50, "📼 영상 인코딩 시작...")
+        # 슬라이드 합성 완료 (split_pct%)
+        progress_bar.progress(split_pct, "📼 영상 인코딩 시작...")
         
         # 모든 슬라이드 연결 및 파일 출력 (커스텀 로거로 진행률 표시)
         safe_title = sanitize_filename(video_title)
         out_path  = OUTPUT_DIR / f"{safe_title}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4"
-        st_logger = StreamlitProgressLogger(progress_bar)
+        st_logger = StreamlitProgressLogger(progress_bar, start_pct=split_pct)
         temp_audio_path = str(TEMP_DIR / f"{safe_title}_TEMP_MPY.mp3")
-        concatenate_videoclips(final_clips, method="compose").write_videofile(
+        t_start   = time.time()
+        timeline  = concatenate_videoclips(final_clips, method="compose")
+        timeline.write_videofile(
             str(out_path), fps=24, logger=st_logger, temp_audiofile=temp_audio_path
         )
+        tracker.sample_mem()
+        # 비용 모델은 슬라이드 단위로 예측하므로 일괄 인코딩 시간도 슬라이드별 길이 비율로 나눠 기록
+        encode_sec = time.time() - t_start
+        for clip in final_clips:
+            tracker.record("encode", clip.duration, encode_sec * clip.duration / timeline.duration)
         
         # MoviePy 임시 파일 정리
         cleanup_moviepy_temp()
         
         # 완료 (100%)
         progress_bar.progress(100, "✅ 렌더링 완료!")
-        return out_path
+        return [out_path]
+
+    except Exception as e:
+        st.error(f"렌더링 오류: {e}")
+        return None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_video_streaming: 슬라이드 단위 스트리밍 렌더링 (긴 문서 / 다중 출력 형식)
+# - 슬라이드를 하나씩 합성 → 형식별 인코더 파이프에 프레임 기록 → 즉시 해제
+# - 메모리/파일 핸들 사용량이 슬라이드 수와 무관하게 일정
+# - TTS 오디오, 자막 타이밍, 이미지 디코딩은 슬라이드당 1회만 수행하여 형식 간 공유
+# - 진행률: 슬라이드 단위 (TTS + 합성 + 인코딩이 함께 진행)
+# - 반환: 출력 영상 경로 리스트 (formats 순서)
+# ─────────────────────────────────────────────────────────────────────────────
+def render_video_streaming(data, video_title, formats, tracker):
+    total_slides = len(data)
+    progress_bar = st.progress(0, text="🚀 렌더링 준비 중...")
+    
+    tts_engine = load_tts_engine()
+    if not tts_engine:
+        st.error("TTS 엔진을 로드할 수 없습니다. requirements.txt를 확인하세요.")
+        return None
+
+    safe_title = sanitize_filename(video_title)
+    stamp      = datetime.now().strftime('%Y%m%d_%H%M%S')
+    encoders   = {}
+    for fmt in formats:
+        layout = OUTPUT_FORMATS[fmt]
+        out    = OUTPUT_DIR / f"{safe_title}_{stamp}{layout['suffix']}.mp4"
+        encoders[fmt] = stream_renderer.StreamingEncoder(out, layout["size"], TEMP_DIR, fps=24)
+    audio_files = []
+
+    try:
+        for i, item in enumerate(data):
+            if not item['text']: continue
+            
+            base     = int((i / total_slides) * 95)
+            eta_text = render_cost.format_eta(tracker.remaining(i))
+            progress_bar.progress(base, f"⏳ 슬라이드 {i+1}/{total_slides} 음성 합성 중... ({base}%) · 남은 시간 약 {eta_text}")
+            
+            a_path = TEMP_DIR / f"v_{i}.wav"
+            t_start = time.time()
+            if not synthesize_slide_audio(tts_engine, item['text'], a_path, i + 1):
+                continue
+            pcm_path = TEMP_DIR / f"v_{i}_pcm.wav"
+            audio_files.append(pcm_path)
+            try:
+                duration = stream_renderer.normalize_audio(a_path, pcm_path)
+            finally:
+                a_path.unlink(missing_ok=True)
+            tracker.record("tts", len(item['text']), time.time() - t_start)
+            tracker.record("audio", len(item['text']), duration)
+            
+            # 형식 간 공유: 자막 타이밍 (+ 형식별 변형이 없는 이미지는 디코딩 결과 공유)
+            t_start = time.time()
+            timing = subtitle_timing(item['text'], duration)
+            images = load_format_images(item['image'], encoders)
+            
+            for n_fmt, (fmt, encoder) in enumerate(encoders.items()):
+                def on_frames(k, n, i=i, base=base, n_fmt=n_fmt, fmt=fmt, eta_text=eta_text):
+                    done = (n_fmt + k / max(n, 1)) / len(encoders)
+                    pct  = base + int(done * 95 / total_slides)
+                    progress_bar.progress(pct, f"📼 슬라이드 {i+1}/{total_slides} [{fmt}] 인코딩 중... ({pct}%) · 남은 시간 약 {eta_text}")
+                
+                slide_clip, subtitle_clips = build_slide_clip(images[fmt], item['text'], duration, timing, OUTPUT_FORMATS[fmt])
+                try:
+                    encoder.add_slide(slide_clip, pcm_path, duration, progress_cb=on_frames)
+                finally:
+                    # 프레임 기록 직후 슬라이드 리소스 해제
+                    for c in subtitle_clips: c.close()
+                    slide_clip.close()
+                    del slide_clip, subtitle_clips
+            del images
+            tracker.record("encode_stream", duration * len(encoders), time.time() - t_start)
+            tracker.slide_done(i)
+
+        if not audio_files:
+            for encoder in encoders.values(): encoder.abort()
+            st.error("렌더링할 슬라이드가 없습니다. 대사를 입력하세요.")
+            return None
+
+        progress_bar.progress(95, "🔊 오디오 병합 중...")
+        out_paths = [encoder.finish() for encoder in encoders.values()]
+        
+        progress_bar.progress(100, "✅ 렌더링 완료!")
+        return out_paths
 
     except Exception as e:
+        for encoder in encoders.values(): encoder.abort()
         st.error(f"렌더링 오류: {e}")
         return None
+    finally:
+        # 슬라이드별 PCM 음성은 인코더 소유가 아니므로(abort는 자체 파일만 정리) 여기서 삭제
+        for f in audio_files:
+            f.unlink(missing_ok=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_video_segments: 병렬 세그먼트 렌더링 (멀티코어)
+# - 앱 프로세스에서 슬라이드별 TTS 합성 → 완료되는 즉시 프로세스 풀에 세그먼트 인코딩 제출
+#   (TTS와 인코딩이 겹쳐 진행, Python 프레임 합성도 코어 수만큼 병렬)
+# - 모든 세그먼트가 SEGMENT_PARAMS로 인코딩되므로 concat demuxer로 영상 재인코딩 없이 연결 (음성은 PCM → 연결 후 AAC 1회 인코딩)
+# - 반환: 출력 영상 경로 리스트 (formats 순서)
+# ─────────────────────────────────────────────────────────────────────────────
+def render_video_segments(data, video_title, formats, tracker):
+    total_slides = len(data)
+    progress_bar = st.progress(0, text="🚀 렌더링 준비 중...")
+
+    tts_engine = load_tts_engine()
+    if not tts_engine:
+        st.error("TTS 엔진을 로드할 수 없습니다. requirements.txt를 확인하세요.")
+        return None
+
+    pool       = load_segment_pool()
+    safe_title = sanitize_filename(video_title)
+    stamp      = datetime.now().strftime('%Y%m%d_%H%M%S')
+    running    = {}   # future -> 슬라이드 인덱스
+    segments   = {}   # 슬라이드 인덱스 -> {형식: 세그먼트 경로}
+    audio      = {}   # 슬라이드 인덱스 -> 음성 파일
+    completed  = set()
+
+    def show_progress(label):
+        pct      = int(len(completed) / total_slides * 95)
+        pending  = [i for i, item in enumerate(data) if item['text'] and i not in completed]
+        eta_text = render_cost.format_eta(tracker.remaining(pending))
+        progress_bar.progress(pct, f"{label} ({pct}%) · 남은 시간 약 {eta_text}")
+
+    def collect(futures):
+        for fut in futures:
+            i = running.pop(fut)
+            duration, encode_sec = fut.result()
+            tracker.record("audio", len(data[i]['text']), duration)
+            tracker.record("encode_segment", duration * len(formats), encode_sec)
+            tracker.slide_done(i)
+            completed.add(i)
+            audio.pop(i).unlink(missing_ok=True)
+
+    try:
+        for i, item in enumerate(data):
+            if not item['text']: continue
+            show_progress(f"⏳ 슬라이드 {i+1}/{total_slides} 음성 합성 중... (인코딩 {len(running)}건 진행)")
+
+            a_path  = TEMP_DIR / f"v_{i}.wav"
+            t_start = time.time()
+            if not synthesize_slide_audio(tts_engine, item['text'], a_path, i + 1):
+                continue
+            tracker.record("tts", len(item['text']), time.time() - t_start)
+
+            outputs = {fmt: TEMP_DIR / f"seg_{stamp}_{i:04d}_{fmt.replace(':', 'x')}{slide_composer.SEGMENT_EXT}" for fmt in formats}
+            fut = pool.submit(slide_composer.encode_segment_task, str(item['image']), item['text'], str(a_path),
+                              {fmt: str(p) for fmt, p in outputs.items()}, str(TEMP_DIR))
+            running[fut]  = i
+            segments[i]   = outputs
+            audio[i]      = a_path
+
+            # 이미 끝난 세그먼트는 바로 수거 (실패 시 즉시 중단)
+            collect([f for f in list(running) if f.done()])
+            # 수용 제어로 허가된 병렬도(tracker.parallel)를 넘지 않도록 대기
+            while len(running) >= tracker.parallel:
+                finished, _ = wait(list(running), timeout=1, return_when=FIRST_COMPLETED)
+                tracker.sample_mem()
+                collect(finished)
+
+        if not segments:
+            st.error("렌더링할 슬라이드가 없습니다. 대사를 입력하세요.")
+            return None
+
+        while running:
+            show_progress(f"📼 세그먼트 인코딩 중... ({len(completed)}/{len(segments)})")
+            finished, _ = wait(list(running), timeout=1, return_when=FIRST_COMPLETED)
+            tracker.sample_mem()
+            collect(finished)
+
+        # 형식별 세그먼트 연결 (영상 재인코딩 없음, 음성만 AAC로 1회 인코딩)
+        progress_bar.progress(95, "🔗 세그먼트 연결 중...")
+        out_paths = []
+        for fmt in formats:
+            out = OUTPUT_DIR / f"{safe_title}_{stamp}{OUTPUT_FORMATS[fmt]['suffix']}.mp4"
+            out_paths.append(slide_composer.concat_segments([segments[i][fmt] for i in sorted(segments)], out, TEMP_DIR))
+
+        progress_bar.progress(100, "✅ 렌더링 완료!")
+        return out_paths
+
+    except Exception as e:
+        for fut in running: fut.cancel()
+        if isinstance(e, BrokenProcessPool):
+            # 작업 프로세스가 비정상 종료된 풀은 재사용 불가 → 다음 렌더링에서 새로 생성
+            load_segment_pool.clear()
+        st.error(f"렌더링 오류: {e}")
+        return None
+    finally:
+        wait(list(running))
+        for paths in segments.values():
+            for p in paths.values():
+                p.unlink(missing_ok=True)
+        for p in audio.values():
+            p.unlink(missing_ok=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# render_video_distributed: 분산 렌더링 (코디네이터)
+# - 슬라이드 단위 작업(TTS + 형식별 세그먼트 인코딩)을 브로커에 게시
+# - 여러 호스트의 워커(render_worker.py)가 처리 → 결과 세그먼트를 받는 즉시 로컬에 저장
+# - 모든 세그먼트 수신 후 코디네이터에서 concat demuxer로 연결 (형식별, 영상은 무손실 복사)
+# - 반환: 출력 영상 경로 리스트 (formats 순서)
+# ─────────────────────────────────────────────────────────────────────────────
+def render_video_distributed(data, video_title, formats, tracker):
+    broker = load_broker()
+    if broker is None:
+        st.error("분산 렌더링 브로커에 연결할 수 없습니다. RENDER_BROKER_URL을 확인하세요.")
+        return None
+
+    progress_bar = st.progress(0, text="🛰️ 작업 게시 중...")
+    job_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.getpid()}_{id(data) & 0xffff:04x}"
+
+    # 보이스 클로닝 참조 음성은 작업에 함께 실어 보냄 (워커 호스트에 파일이 없어도 동일 음성)
+    ref_audio = Path(REF_AUDIO_PATH).read_bytes() if os.path.exists(REF_AUDIO_PATH) else None
+    units = []
+    for i, item in enumerate(data):
+        if not item['text']: continue
+        units.append((i, {
+            'text'          : item['text'],
+            'image'         : Path(item['image']).read_bytes(),
+            'image_ext'     : Path(item['image']).suffix or ".png",
+            'variants'      : {tag: p.read_bytes() for tag, p in image_normalizer.variant_files(item['image']).items()},
+            'formats'       : list(formats),
+            'ref_audio'     : ref_audio,
+            'ref_audio_ext' : Path(REF_AUDIO_PATH).suffix,
+            'ref_text'      : REF_TEXT,
+        }))
+    if not units:
+        st.error("렌더링할 슬라이드가 없습니다. 대사를 입력하세요.")
+        return None
+
+    broker.publish(job_id, units)
+    segments = {}   # unit_id -> {형식: 세그먼트 경로}
+    deadline = time.time() + render_broker.JOB_TIMEOUT
+    last_live = time.time()   # 활성 워커를 마지막으로 확인한 시각
+    try:
+        while True:
+            status  = broker.poll(job_id)
+            failed  = [(u, err) for u, (state, err) in status.items() if state == "failed"]
+            if failed:
+                raise RuntimeError(f"슬라이드 {failed[0][0] + 1} 처리 실패: {failed[0][1]}")
+
+            # 완료된 세그먼트는 즉시 수거 (브로커 저장 공간 해제)
+            for unit_id, (state, _) in status.items():
+                if state != "done": continue
+                result = broker.take_result(job_id, unit_id)
+                if result is None: continue
+                segments[unit_id] = {}
+                for fmt, blob in result['segments'].items():
+                    seg_path = TEMP_DIR / f"seg_{job_id}_{unit_id:04d}_{fmt.replace(':', 'x')}{slide_composer.SEGMENT_EXT}"
+                    seg_path.write_bytes(blob)
+                    segments[unit_id][fmt] = seg_path
+                if result.get('fallback'):
+                    st.warning(f"슬라이드 {unit_id + 1} 오디오 생성 실패. 기본 TTS로 대체했습니다.")
+                text = data[unit_id]['text']
+                tracker.record("tts", len(text), result['tts_sec'])
+                tracker.record("audio", len(text), result['duration'])
+                tracker.record("encode_segment", result['duration'] * len(formats), result['encode_sec'])
+                tracker.slide_done(unit_id)
+
+            done = len(segments)
+            if done == len(units):
+                break
+            pending  = [u for u, _ in units if u not in segments]
+            eta_text = render_cost.format_eta(tracker.remaining(pending))
+            workers  = broker.live_workers()
+            now      = time.time()
+            if workers:
+                last_live = now
+            elif now - last_live > render_broker.NO_WORKER_TIMEOUT:
+                raise RuntimeError(f"{render_broker.NO_WORKER_TIMEOUT}초 동안 활성 워커가 없어 렌더링을 중단했습니다. "
+                                   "render_worker.py 실행 여부를 확인하세요.")
+            if now > deadline:
+                raise RuntimeError(f"분산 렌더링 제한 시간({render_broker.JOB_TIMEOUT}초)을 초과했습니다.")
+            pct      = int(done / len(units) * 95)
+            progress_bar.progress(pct, f"🛰️ 워커 {workers}대 처리 중... ({done}/{len(units)}) · 남은 시간 약 {eta_text}"
+                                  if workers else f"⏳ 대기 중인 워커가 없습니다... ({done}/{len(units)})")
+            time.sleep(1)
+
+        # 형식별 세그먼트 연결 (영상 재인코딩 없음, 음성만 AAC로 1회 인코딩)
+        progress_bar.progress(95, "🔗 세그먼트 연결 중...")
+        safe_title = sanitize_filename(video_title)
+        stamp      = datetime.now().strftime('%Y%m%d_%H%M%S')
+        out_paths  = []
+        for fmt in formats:
+            out = OUTPUT_DIR / f"{safe_title}_{stamp}{OUTPUT_FORMATS[fmt]['suffix']}.mp4"
+            ordered = [segments[u][fmt] for u, _ in units]
+            out_paths.append(slide_composer.concat_segments(ordered, out, TEMP_DIR))
+
+        progress_bar.progress(100, "✅ 렌더링 완료!")
+        return out_paths
+
+    except Exception as e:
+        st.error(f"렌더링 오류: {e}")
+        return None
+    finally:
+        broker.delete_job(job_id)
+        for paths in segments.values():
+            for p in paths.values():
+                p.unlink(missing_ok=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -558,6 +1077,28 @@ def main():
     # 사이드바: 파일 업로드 및 설정
     # ─────────────────────────────────────────────────────────────────
     with st.sidebar:
+        # 프로젝트 선택: 저장된 프로젝트 복원 (슬라이드/대본/순서)
+        st.header("🗂️ 프로젝트")
+        store    = load_project_store()
+        projects = {p['id']: f"{p['name']} ({p['slide_count']}장)" for p in store.list_projects()}
+        current  = st.session_state.get('project_id')
+        options  = [None] + list(projects)
+        picked   = st.selectbox("저장된 프로젝트", options, index=options.index(current) if current in projects else 0,
+                                format_func=lambda pid: "— 선택 —" if pid is None else projects[pid], key="project_pick")
+        col_load, col_pdel = st.columns(2)
+        with col_load:
+            if st.button("📂 불러오기", width='stretch', disabled=(picked is None or picked == current)):
+                restore_project(picked)
+        with col_pdel:
+            if st.button("🗑️ 삭제", width='stretch', disabled=picked is None):
+                store.delete_project(picked)
+                if picked == current:
+                    del st.session_state.project_id
+                    if 'master_slides' in st.session_state: del st.session_state.master_slides
+                    clear_script_widgets()
+                st.rerun()
+        
+        st.divider()
         st.header("📂 교육 자료 업로드")
         
         # 업로드 모드 선택
@@ -588,52 +1129,176 @@ def main():
         if st.button("🧹 수동 클렌징", width='stretch'):
             clear_work_directories()
             if 'master_slides' in st.session_state: del st.session_state.master_slides
+            clear_script_widgets()
+            # 저장된 프로젝트는 유지하고 현재 세션에서만 분리
+            if 'project_id' in st.session_state: del st.session_state.project_id
             st.rerun()
+        # 병렬 렌더링: 슬라이드별 세그먼트를 여러 코어에서 동시에 인코딩 후 영상 무손실 연결
+        parallel    = st.checkbox(f"⚡ 병렬 렌더링 ({slide_composer.SEGMENT_WORKERS}코어)",
+                                  value=slide_composer.SEGMENT_WORKERS > 1, key="parallel_render")
+        # 스트리밍 렌더링: 슬라이드 단위로 인코딩하여 메모리 사용량 일정 유지 (긴 문서용)
+        # - 병렬 렌더링도 슬라이드 단위로 처리하므로 병렬 선택 시에는 비활성
+        slide_count = len(st.session_state.get('master_slides', []))
+        streaming   = st.checkbox("🌊 스트리밍 렌더링 (긴 문서용)", value=slide_count > STREAMING_AUTO, key="streaming_render",
+                                  disabled=parallel, help="병렬 렌더링을 끄면 선택할 수 있습니다." if parallel else None)
+        # 출력 형식: 여러 개 선택 시 한 번의 렌더링으로 함께 생성 (9:16 = YouTube Shorts)
+        out_formats = st.multiselect("출력 형식", list(OUTPUT_FORMATS), default=["16:9"], key="out_formats") or ["16:9"]
+        # 분산 렌더링: 브로커가 설정된 경우에만 표시 (슬라이드 단위 작업을 워커들이 처리)
+        distributed = False
+        if render_broker.BROKER_URL:
+            distributed = st.checkbox("🛰️ 분산 렌더링 (워커)", value=False, key="distributed_render")
         render_btn = st.button("🚀 영상 렌더링 시작", type="primary", width='stretch')
+        # 예상 소요 시간 (렌더링 이력 기반 비용 모델)
+        if slide_count:
+            texts    = [s.get('script', '') for s in st.session_state.master_slides]
+            mode     = render_mode(streaming or out_formats != ["16:9"], distributed, parallel)
+            lanes    = segment_lanes(load_cost_model(), len(out_formats)) if mode == "segment" else 1
+            estimate = load_cost_model().estimate(texts, mode, len(out_formats), lanes)
+            if estimate['slides']:
+                st.caption(f"⏱️ 예상 렌더링 시간: 약 {render_cost.format_eta(estimate['seconds'])}")
 
     # ─────────────────────────────────────────────────────────────────
     # 메인 영역: 파일 업로드 시 활성화
     # ─────────────────────────────────────────────────────────────────
-    if uploaded_files:
+    # 파일 미업로드 상태: 업로드 감지 플래그 정리
+    if not uploaded_files and 'current_file_set' in st.session_state: del st.session_state.current_file_set
+
+    if uploaded_files or st.session_state.get('master_slides'):
         # 파일 처리 함수 (진행률 표시 포함)
         def process_uploaded_files(files, progress_bar):
             new_assets = []
             total_files = len(files)
+            cache = load_ingest_cache()
+            
+            # 안전한 파일명 생성 (인덱스 + 타임스탬프)
+            stamp      = datetime.now().strftime('%H%M%S')
+            safe_bases = [f"{idx+1:02d}_{stamp}" for idx in range(total_files)]
+            
+            # PPT 변환기 (PPT가 있을 때만 로드) - 렌더러 종류도 캐시 키에 포함
+            converter = None
+            if any(f.name.endswith(('.ppt', '.pptx')) for f in files):
+                converter = load_ppt_converter()
+            ppt_renderer = "libreoffice" if converter else "text"
+            
+            # 이미지 정규화 기준: 출력 형식별 이미지 영역 (형식마다 표시 크기 그대로 저장 → 렌더링 시 리사이즈 없음)
+            image_boxes = {fmt: list(layout["image_box"]) for fmt, layout in OUTPUT_FORMATS.items()}
+            
+            # 캐시 조회: 내용 해시 + 렌더링 파라미터 (히트 시 재처리 생략)
+            keys, cached = [], {}
+            for idx, up_file in enumerate(files):
+                if up_file.type == "application/pdf":
+                    params = {"kind": "pdf", "dpi": 150}
+                elif up_file.type.startswith("image/"):
+                    params = {"kind": "image", "ext": Path(up_file.name).suffix.lower(),
+                              "normalize": image_normalizer.NORMALIZE_VERSION, "boxes": image_boxes}
+                else:
+                    params = {"kind": "ppt", "renderer": ppt_renderer, "dpi": ppt_converter.RENDER_DPI}
+                keys.append(ingest_cache.make_key(up_file.getvalue(), **params))
+                pages = cache.get(keys[idx], TEMP_DIR, f"c_{safe_bases[idx]}")
+                if pages is not None:
+                    cached[idx] = pages
+            
+            # PPT는 변환 워커 풀에 먼저 모두 제출하여 덱 단위로 병렬 변환
+            ppt_jobs = {}
+            if converter:
+                for idx, up_file in enumerate(files):
+                    if up_file.name.endswith(('.ppt', '.pptx')) and idx not in cached:
+                        src = TEMP_DIR / f"src_{safe_bases[idx]}{Path(up_file.name).suffix}"
+                        with open(src, "wb") as f: f.write(up_file.getbuffer())
+                        ppt_jobs[idx] = (src, converter.submit(src, TEMP_DIR, f"ppt_{safe_bases[idx]}"))
+            
+            # 이미지도 정규화 스레드 풀에 먼저 모두 제출하여 병렬 처리
+            image_jobs = {}
+            for idx, up_file in enumerate(files):
+                if up_file.type.startswith("image/") and idx not in cached:
+                    image_jobs[idx] = load_image_pool().submit(
+                        image_normalizer.normalize_image, up_file.getvalue(), TEMP_DIR, f"img_{safe_bases[idx]}", image_boxes
+                    )
             
             for idx, up_file in enumerate(files):
                 progress_bar.progress((idx / total_files), f"📁 파일 처리 중... ({idx+1}/{total_files})")
+                safe_base = safe_bases[idx]
+                pages     = cached.get(idx)
+                is_ppt    = up_file.name.endswith(('.ppt', '.pptx'))
                 
-                # 안전한 파일명 생성 (인덱스 + 타임스탬프)
-                safe_base = f"{idx+1:02d}_{datetime.now().strftime('%H%M%S')}"
-                
+                if pages is not None:
+                    progress_bar.progress((idx / total_files), f"⚡ 캐시 사용... {up_file.name}")
                 # 1. PDF 처리
-                if up_file.type == "application/pdf":
+                elif up_file.type == "application/pdf":
+                    pages = []
                     doc = fitz.open(stream=up_file.read(), filetype="pdf")
                     total_pages = len(doc)
                     for i in range(total_pages):
                         progress_bar.progress((idx / total_files) + (i / total_pages / total_files), 
                                               f"📄 PDF 변환 중... {up_file.name} ({i+1}/{total_pages})")
                         target = TEMP_DIR / f"pdf_{safe_base}_p{i+1:02d}.png"
-                        doc.load_page(i).get_pixmap(dpi=150).save(str(target))
-                        new_assets.append({'path': target, 'label': f"{up_file.name} - P{i+1}", 'script': ""})
+                        page = doc.load_page(i)
+                        page.get_pixmap(dpi=150).save(str(target))
+                        pages.append({'path': target, 'text': page.get_text().strip()})
                 # 2. 이미지 처리
                 elif up_file.type.startswith("image/"):
-                    ext = Path(up_file.name).suffix or ".png"
-                    target = TEMP_DIR / f"img_{safe_base}{ext}"
-                    with open(target, "wb") as f: f.write(up_file.getbuffer())
-                    new_assets.append({'path': target, 'label': up_file.name, 'script': ""})
+                    progress_bar.progress((idx / total_files), f"🖼️ 이미지 정규화 중... {up_file.name}")
+                    try:
+                        target, thumb = image_jobs[idx].result()
+                    except Exception as e:
+                        logger.error(f"Image Normalize Error ({up_file.name}): {e}")
+                        st.warning(f"{up_file.name} 이미지를 읽을 수 없어 건너뜁니다.")
+                        continue
+                    pages = [{'path': target, 'thumb': thumb, 'text': ""}]
                 # 3. PPT 처리
-                elif up_file.name.endswith(('.ppt', '.pptx')):
-                    ppt_assets = process_pptx(up_file, TEMP_DIR)
-                    for asset in ppt_assets:
-                        asset['script'] = ""  # 통합 구조에 script 추가
-                    new_assets.extend(ppt_assets)
+                elif is_ppt:
+                    rendered_pages = None
+                    if idx in ppt_jobs:
+                        src, future = ppt_jobs[idx]
+                        progress_bar.progress((idx / total_files), f"📊 PPT 렌더링 중... {up_file.name}")
+                        try:
+                            rendered_pages = future.result()
+                        except Exception as e:
+                            logger.error(f"PPT Render Error ({up_file.name}): {e}")
+                            st.warning(f"{up_file.name} 렌더링 실패. 텍스트 모드로 처리합니다.")
+                        finally:
+                            src.unlink(missing_ok=True)
+                    up_file.seek(0)
+                    ppt_assets = process_pptx(up_file, TEMP_DIR, safe_base, rendered_pages)
+                    pages = [{'path': a['path'], 'text': a['extracted_text']} for a in ppt_assets]
+                    # 렌더링 이미지도 텍스트도 없으면 (예: 변환기 없이 .ppt 업로드) 조용히 사라지지 않도록 알림
+                    if not pages:
+                        st.warning(f"{up_file.name}에서 슬라이드를 읽을 수 없습니다. "
+                                   "(.ppt 파일은 LibreOffice 변환기가 필요합니다. .pptx로 저장 후 다시 업로드하세요.)")
+                        continue
+                    # 렌더링 실패로 텍스트 모드가 된 결과는 캐시하지 않음 (다음 업로드 때 재시도)
+                    if rendered_pages is None and converter:
+                        keys[idx] = None
+                else:
+                    continue
+                
+                # 신규 처리 결과는 캐시에 저장 (썸네일 생성 포함)
+                if idx not in cached and keys[idx] is not None:
+                    try:
+                        pages = cache.put(keys[idx], pages, TEMP_DIR, f"c_{safe_base}")
+                    except Exception as e:
+                        logger.error(f"Ingest Cache Error ({up_file.name}): {e}")
+                
+                for i, page in enumerate(pages):
+                    if is_ppt:
+                        label = f"PPT Slide {i+1}"
+                    elif up_file.type == "application/pdf":
+                        label = f"{up_file.name} - P{i+1}"
+                    else:
+                        label = up_file.name
+                    new_assets.append({
+                        'path'           : page['path'],
+                        'thumb'          : page.get('thumb'),
+                        'label'          : label,
+                        'extracted_text' : page.get('text', ""),
+                        'script'         : ""
+                    })
             
             progress_bar.progress(1.0, "✅ 파일 처리 완료!")
             return new_assets
         
         # 새 파일 업로드 감지
-        if 'current_file_set' not in st.session_state:
+        if uploaded_files and 'current_file_set' not in st.session_state:
             st.session_state.current_file_set = True
             
             # 진행률 표시바 생성
@@ -644,6 +1309,8 @@ def main():
                 clear_work_directories()
                 new_assets = process_uploaded_files(uploaded_files, progress_bar)
                 st.session_state.master_slides = new_assets
+                # 교체 업로드는 새 프로젝트로 저장 (기존 프로젝트는 그대로 유지)
+                st.session_state.project_id = load_project_store().create_project(Path(uploaded_files[0].name).stem)
             else:  # ➕ 추가 모드
                 new_assets = process_uploaded_files(uploaded_files, progress_bar)
                 existing = st.session_state.master_slides
@@ -660,6 +1327,29 @@ def main():
         if 'master_slides' not in st.session_state:
             st.session_state.master_slides = []
 
+        # AI 대본 생성: 슬라이드 이미지/텍스트를 배치로 Gemini에 전달 (변경 없는 슬라이드는 캐시 사용)
+        with st.expander("🤖 AI 대본 생성", expanded=False):
+            only_empty = st.checkbox("빈 대사만 채우기", value=True, key="ai_only_empty")
+            if st.button("✨ 대본 생성", width='stretch'):
+                generator = load_script_generator()
+                if not generator:
+                    st.error("대본 생성기를 로드할 수 없습니다. GOOGLE_API_KEY를 확인하세요.")
+                else:
+                    slides = st.session_state.master_slides
+                    only   = {i for i, s in enumerate(slides) if not s.get('script', '').strip()} if only_empty else None
+                    ai_bar = st.progress(0, text="🤖 대본 생성 중...")
+                    def on_progress(done, total):
+                        ai_bar.progress(done / total if total else 1.0, f"🤖 대본 생성 중... ({done}/{total})")
+                    scripts, errors = generator.generate(slides, only=only, progress_cb=on_progress)
+                    for idx, text in scripts.items():
+                        st.session_state.master_slides[idx]['script'] = text
+                        st.session_state[f"t_{idx}"] = text
+                    for err in errors:
+                        st.warning(f"대본 생성 실패: {err}")
+                    logger.info(f"Script generation: {len(scripts)} slides, {len(errors)} errors")
+                    if scripts:
+                        st.rerun()
+
         # JSON 일괄 입력: {슬라이드번호: 대사텍스트} 형식의 JSON 파싱
         with st.expander("🛠️ JSON 대사 일괄 입력", expanded=False):
             json_text = st.text_area("JSON 데이터를 붙여넣으세요")
@@ -684,8 +1374,8 @@ def main():
             with st.container(border=True):
                 c1, c2, c3 = st.columns([1, 2, 0.3])
                 with c1: 
-                    # 파일을 직접 읽어서 표시 (경로 문제 방지)
-                    img_path = Path(slide['path'])
+                    # 파일을 직접 읽어서 표시 (경로 문제 방지) - 썸네일이 있으면 썸네일 사용
+                    img_path = Path(slide.get('thumb') or slide['path'])
                     if img_path.exists():
                         with open(img_path, "rb") as img_file:
                             st.image(img_file.read(), use_container_width=True)
@@ -708,6 +1398,9 @@ def main():
                     if st.button("🗑️", key=f"del_{i}"):
                         delete_slide(i)
 
+        # 편집 내용 자동 저장 (바뀐 슬라이드만)
+        autosave_project()
+
         # ─────────────────────────────────────────────────────────────
         # 렌더링 트리거: 영상 생성
         # ─────────────────────────────────────────────────────────────
@@ -717,10 +1410,12 @@ def main():
                 "text"  : s.get('script', '')
             } for s in st.session_state.master_slides]
 
-            video_file = render_video(render_data, "DocuMotion Video")
-            if video_file:
-                st.session_state.last_v = str(video_file)
-                st.video(st.session_state.last_v)
+            video_files = render_video(render_data, "DocuMotion Video", streaming=streaming,
+                                       formats=out_formats, distributed=distributed, parallel=parallel)
+            if video_files:
+                st.session_state.last_v = str(video_files[0])
+                for video_file in video_files:
+                    st.video(str(video_file))
 
         if 'last_v' in st.session_state:
             st.divider()
@@ -734,9 +1429,8 @@ def main():
                     st.download_button("💾 동영상 다운로드", f, file_name=f"{video_name}.mp4")
         
     else:
-        # 파일 미업로드 상태: 세션 정리 및 안내 메시지
-        if 'current_file_set' in st.session_state: del st.session_state.current_file_set
-        st.info("파일을 업로드하여 시작하세요.")
+        # 파일 미업로드 상태: 안내 메시지
+        st.info("파일을 업로드하거나 저장된 프로젝트를 불러와 시작하세요.")
     
     # ─────────────────────────────────────────────────────────────
     # YouTube 업로드 다이얼로그 (전역)
@@ -0,0 +1,173 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import fitz
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+# 상주 LibreOffice 워커 수 (동시에 변환 가능한 덱 수)
+POOL_SIZE          = int(os.environ.get("PPT_CONVERTER_WORKERS", "2"))
+
+# 워커별 포트: XML-RPC(BASE_PORT + i*2), UNO(BASE_PORT + i*2 + 1)
+BASE_PORT          = int(os.environ.get("PPT_CONVERTER_BASE_PORT", "2003"))
+
+START_TIMEOUT      = 60     # 워커 기동 대기 한도 (초) - LibreOffice 최초 기동은 수 초 이상 소요
+CONVERT_TIMEOUT    = 180    # 덱 1개 변환 한도 (초)
+RENDER_DPI         = 150    # PDF → PNG 래스터화 해상도 (PDF 업로드와 동일)
+
+
+
+# ===================================================================================================================
+# is_available: 변환기 실행 파일 존재 여부 확인
+# - unoserver(상주 서버) + unoconvert(클라이언트) 둘 다 있어야 사용 가능
+# ===================================================================================================================
+
+def is_available():
+    return bool(shutil.which("unoserver") and shutil.which("unoconvert"))
+
+
+# ===================================================================================================================
+# rasterize_pdf: PDF를 페이지별 PNG로 저장
+# ===================================================================================================================
+
+def rasterize_pdf(pdf_path, out_dir, stem, dpi=RENDER_DPI):
+    pages = []
+    with fitz.open(str(pdf_path)) as doc:
+        for i in range(len(doc)):
+            target = Path(out_dir) / f"{stem}_p{i+1:02d}.png"
+            doc.load_page(i).get_pixmap(dpi=dpi).save(str(target))
+            pages.append(target)
+    return pages
+
+
+# ===================================================================================================================
+# ConverterPool: 상주 headless LibreOffice 워커 풀
+# - 워커마다 unoserver 프로세스 1개를 띄워두고 재사용 (기동 비용은 워커당 1회만 지불)
+# - 워커마다 별도 사용자 프로필을 사용하여 인스턴스 간 충돌 방지
+# - submit()으로 여러 덱을 병렬 변환, 결과는 Future로 반환
+# ===================================================================================================================
+
+class ConverterPool:
+    def __init__(self, size=POOL_SIZE, base_port=BASE_PORT):
+        self.size        = max(1, size)
+        self.base_port   = base_port
+        self.profile_dir = Path(tempfile.gettempdir()) / "documotion_lo_profiles"
+        self._procs      = {}                  # port -> Popen
+        self._free       = queue.Queue()       # 유휴 워커 포트
+        self._lock       = threading.Lock()
+        self._executor   = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ppt-conv")
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 워커 기동 / 상태 확인
+    # ─────────────────────────────────────────────────────────────────────────
+    def _spawn(self, port):
+        profile = self.profile_dir / f"worker_{port}"
+        profile.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            "unoserver",
+            "--interface", "127.0.0.1",
+            "--port", str(port),
+            "--uno-port", str(port + 1),
+            "--user-installation", profile.as_uri(),
+        ]
+        self._procs[port] = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _wait_ready(self, port, timeout=START_TIMEOUT):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            proc = self._procs.get(port)
+            if proc is None or proc.poll() is not None:
+                return False
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1):
+                    return True
+            except OSError:
+                time.sleep(0.5)
+        return False
+
+    def _ensure_alive(self, port):
+        with self._lock:
+            proc = self._procs.get(port)
+            if proc is not None and proc.poll() is None:
+                return True
+            print(f"⚠️ PPT 변환 워커 재시작 (port {port})")
+            self._spawn(port)
+        return self._wait_ready(port)
+
+    def start(self):
+        if not is_available():
+            print("⚠️ unoserver/unoconvert를 찾을 수 없습니다. PPT는 텍스트 모드로 처리됩니다.")
+            return False
+
+        ports = [self.base_port + i * 2 for i in range(self.size)]
+        for port in ports:
+            self._spawn(port)
+
+        # 워커들은 병렬로 기동되므로 대기는 한 번에
+        ready = [port for port in ports if self._wait_ready(port)]
+        for port in ready:
+            self._free.put(port)
+
+        print(f"✅ PPT 변환 워커 {len(ready)}/{len(ports)}개 준비 완료")
+        return len(ready) > 0
+
+    @property
+    def available(self):
+        return any(p.poll() is None for p in self._procs.values())
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 변환
+    # ─────────────────────────────────────────────────────────────────────────
+    def _convert(self, src_path, out_dir, stem, dpi):
+        port = self._free.get()
+        pdf_path = Path(out_dir) / f"{stem}.pdf"
+        try:
+            if not self._ensure_alive(port):
+                raise RuntimeError(f"PPT 변환 워커 기동 실패 (port {port})")
+            cmd = [
+                "unoconvert",
+                "--host", "127.0.0.1",
+                "--port", str(port),
+                "--convert-to", "pdf",
+                str(src_path), str(pdf_path),
+            ]
+            subprocess.run(cmd, check=True, timeout=CONVERT_TIMEOUT,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            return rasterize_pdf(pdf_path, out_dir, stem, dpi)
+        except subprocess.TimeoutExpired:
+            # 멈춘 워커는 종료시키고 다음 사용 시 재기동
+            self._procs[port].kill()
+            raise
+        finally:
+            if pdf_path.exists():
+                pdf_path.unlink()
+            self._free.put(port)
+
+    def submit(self, src_path, out_dir, stem, dpi=RENDER_DPI):
+        return self._executor.submit(self._convert, src_path, out_dir, stem, dpi)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for proc in self._procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,189 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import threading
+
+from pathlib import Path
+
+# 출력 형식별 변형 이미지 (<stem>@<tag><ext>)는 기본 자산과 함께 보관
+from image_normalizer import VARIANT_SEP, variant_path, variant_files
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+DB_NAME      = "projects.db"
+ASSET_DIR    = "assets"
+
+# 슬라이드 1장에서 저장 대상 필드 (순서 = slides 테이블 컬럼 순서)
+SLIDE_FIELDS = ("label", "path", "thumb", "extracted_text", "script")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id          TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    created     REAL NOT NULL,
+    updated     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS slides (
+    project_id      TEXT NOT NULL,
+    slide_id        TEXT NOT NULL,
+    position        INTEGER NOT NULL,
+    label           TEXT,
+    path            TEXT,
+    thumb           TEXT,
+    extracted_text  TEXT,
+    script          TEXT,
+    PRIMARY KEY (project_id, slide_id)
+);
+CREATE INDEX IF NOT EXISTS idx_slides_position ON slides (project_id, position);
+"""
+
+
+
+# ===================================================================================================================
+# ProjectStore: 프로젝트(슬라이드 목록/대본/순서/자산 경로) 영속 저장소 (SQLite)
+# - sync(): 현재 슬라이드 상태와 DB를 비교하여 바뀐 행만 기록 (매 rerun 호출 가능)
+# - 자산(슬라이드 이미지/썸네일)은 내용 해시 이름으로 assets/에 복사 → temp/ 클렌징과 무관
+#   (하드링크는 temp/의 같은 이름 파일이 덮어써질 때 자산 내용까지 바뀌므로 사용하지 않음)
+# - load(): 쿼리 1회로 복원 (재변환 없음)
+# ===================================================================================================================
+
+class ProjectStore:
+    def __init__(self, root):
+        self.root      = Path(root)
+        self.asset_dir = self.root / ASSET_DIR
+        self.asset_dir.mkdir(parents=True, exist_ok=True)
+        self._lock     = threading.Lock()
+        self._conn     = sqlite3.connect(str(self.root / DB_NAME), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 프로젝트 관리
+    # ─────────────────────────────────────────────────────────────────────────
+    def create_project(self, name):
+        project_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO projects VALUES (?, ?, ?, ?)", (project_id, name, now, now))
+        return project_id
+
+    def list_projects(self):
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT p.id, p.name, p.updated, COUNT(s.slide_id)
+                FROM projects p LEFT JOIN slides s ON s.project_id = p.id
+                GROUP BY p.id ORDER BY p.updated DESC
+            """).fetchall()
+        return [{'id': r[0], 'name': r[1], 'updated': r[2], 'slide_count': r[3]} for r in rows]
+
+    def delete_project(self, project_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM slides WHERE project_id = ?", (project_id,))
+            self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        self._collect_assets()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # 자산 관리
+    # ─────────────────────────────────────────────────────────────────────────
+    def adopt_asset(self, path):
+        path = Path(path)
+        if path.parent == self.asset_dir or not path.exists():
+            return path
+
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        target = self.asset_dir / f"{h.hexdigest()}{path.suffix.lower()}"
+        for src, dst in [(path, target)] + [(f, variant_path(target, tag)) for tag, f in variant_files(path).items()]:
+            if not dst.exists():
+                tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+                shutil.copy2(src, tmp)
+                os.replace(tmp, dst)
+        return target
+
+    def _collect_assets(self):
+        with self._lock:
+            used = {Path(p).name for row in self._conn.execute("SELECT path, thumb FROM slides") for p in row if p}
+        for f in self.asset_dir.iterdir():
+            base = f.stem.split(VARIANT_SEP, 1)[0] + f.suffix
+            if f.name not in used and base not in used:
+                f.unlink(missing_ok=True)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # load: 프로젝트 슬라이드 복원 (master_slides 형식)
+    # ─────────────────────────────────────────────────────────────────────────
+    def load(self, project_id):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT slide_id, {', '.join(SLIDE_FIELDS)} FROM slides WHERE project_id = ? ORDER BY position",
+                (project_id,)
+            ).fetchall()
+
+        slides = []
+        for row in rows:
+            slide = {'id': row[0]}
+            slide.update({k: v for k, v in zip(SLIDE_FIELDS, row[1:])})
+            slide['path']   = Path(slide['path'])
+            slide['thumb']  = Path(slide['thumb']) if slide['thumb'] else None
+            slide['script'] = slide['script'] or ""
+            slides.append(slide)
+        return slides
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # sync: 현재 슬라이드 목록을 DB에 증분 반영
+    # - 새 슬라이드에는 id 부여 + 자산을 assets/로 이전 (slide dict의 경로도 갱신)
+    # - 바뀐 행만 UPSERT, 사라진 슬라이드는 DELETE
+    # - 반환: 변경된 행 수
+    # ─────────────────────────────────────────────────────────────────────────
+    def sync(self, project_id, slides):
+        rows = []
+        for position, slide in enumerate(slides):
+            if not slide.get('id'):
+                slide['id'] = uuid.uuid4().hex
+            for key in ('path', 'thumb'):
+                if slide.get(key):
+                    slide[key] = self.adopt_asset(slide[key])
+            values = tuple(str(slide[k]) if k in ('path', 'thumb') and slide.get(k) else slide.get(k) for k in SLIDE_FIELDS)
+            rows.append((slide['id'], position) + values)
+
+        with self._lock:
+            saved = {
+                r[0]: tuple(r[1:]) for r in self._conn.execute(
+                    f"SELECT slide_id, position, {', '.join(SLIDE_FIELDS)} FROM slides WHERE project_id = ?",
+                    (project_id,)
+                )
+            }
+            changed = [r for r in rows if saved.get(r[0]) != tuple(r[1:])]
+            removed = set(saved) - {r[0] for r in rows}
+            if not changed and not removed:
+                return 0
+
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO slides (project_id, slide_id, position, {', '.join(SLIDE_FIELDS)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(SLIDE_FIELDS))})",
+                    [(project_id,) + r for r in changed]
+                )
+                self._conn.executemany(
+                    "DELETE FROM slides WHERE project_id = ? AND slide_id = ?",
+                    [(project_id, sid) for sid in removed]
+                )
+                self._conn.execute("UPDATE projects SET updated = ? WHERE id = ?", (time.time(), project_id))
+        return len(changed) + len(removed)
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,335 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import json
+import time
+import base64
+import socket
+import sqlite3
+
+from pathlib import Path
+from urllib.parse import urlparse
+
+# [선택] Redis 브로커 (여러 호스트 분산 시) - 미설치 시 SQLite 브로커만 사용 가능
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+# 브로커 주소 (예: sqlite:///broker/broker.db, redis://redis-host:6379/0) - 비어 있으면 분산 렌더링 비활성
+BROKER_URL     = os.environ.get("RENDER_BROKER_URL", "")
+
+LEASE_SEC      = int(os.environ.get("RENDER_LEASE_SEC", "600"))   # 작업 임대 시간 (워커 사망 시 재배정 기준)
+MAX_ATTEMPTS   = 3                                                # 작업당 최대 시도 횟수
+WORKER_TTL     = 30                                               # 워커 하트비트 유효 시간 (초)
+
+# 코디네이터 중단 기준: 활성 워커 없이 대기한 시간 / 작업 전체 제한 시간 (초)
+NO_WORKER_TIMEOUT = int(os.environ.get("RENDER_NO_WORKER_TIMEOUT", "120"))
+JOB_TIMEOUT       = int(os.environ.get("RENDER_JOB_TIMEOUT", "3600"))
+
+
+
+# ===================================================================================================================
+# pack / unpack: 작업/결과 직렬화 (JSON + bytes는 base64)
+# ===================================================================================================================
+
+def _encode(obj):
+    if isinstance(obj, bytes):
+        return {"__b64__": base64.b64encode(obj).decode("ascii")}
+    if isinstance(obj, dict):
+        return {k: _encode(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_encode(v) for v in obj]
+    return obj
+
+
+def _decode(obj):
+    if isinstance(obj, dict):
+        if set(obj) == {"__b64__"}:
+            return base64.b64decode(obj["__b64__"])
+        return {k: _decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode(v) for v in obj]
+    return obj
+
+
+def pack(obj):
+    return json.dumps(_encode(obj), ensure_ascii=False).encode("utf-8")
+
+
+def unpack(data):
+    return _decode(json.loads(data.decode("utf-8") if isinstance(data, bytes) else data))
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ===================================================================================================================
+# SQLiteBroker: 단일 호스트용 로컬 브로커 (테스트 / 소규모 운영)
+# - 워커 프로세스마다 별도 연결, BEGIN IMMEDIATE로 작업 선점을 원자적으로 처리
+# - 임대 시간이 지난 running 작업은 다른 워커가 다시 가져감
+# ===================================================================================================================
+
+class SQLiteBroker:
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                job_id      TEXT NOT NULL,
+                unit_id     INTEGER NOT NULL,
+                status      TEXT NOT NULL,
+                payload     BLOB,
+                result      BLOB,
+                error       TEXT,
+                worker      TEXT,
+                lease_until REAL,
+                attempts    INTEGER NOT NULL DEFAULT 0,
+                created     REAL NOT NULL,
+                PRIMARY KEY (job_id, unit_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created);
+            CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, last_seen REAL NOT NULL);
+        """)
+
+    # ── 코디네이터 측 ──────────────────────────────────────────────────────────
+    def publish(self, job_id, units):
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany(
+                "INSERT INTO tasks (job_id, unit_id, status, payload, created) VALUES (?, ?, 'queued', ?, ?)",
+                [(job_id, unit_id, pack(payload), now) for unit_id, payload in units]
+            )
+
+    def poll(self, job_id):
+        rows = self.conn.execute("SELECT unit_id, status, error FROM tasks WHERE job_id = ?", (job_id,)).fetchall()
+        return {unit_id: (status, error) for unit_id, status, error in rows}
+
+    def take_result(self, job_id, unit_id):
+        row = self.conn.execute("SELECT result FROM tasks WHERE job_id = ? AND unit_id = ?", (job_id, unit_id)).fetchone()
+        self.conn.execute("UPDATE tasks SET result = NULL, status = 'collected' WHERE job_id = ? AND unit_id = ?",
+                          (job_id, unit_id))
+        return unpack(row[0]) if row and row[0] is not None else None
+
+    def delete_job(self, job_id):
+        self.conn.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
+
+    def live_workers(self):
+        return self.conn.execute("SELECT COUNT(*) FROM workers WHERE last_seen > ?",
+                                 (time.time() - WORKER_TTL,)).fetchone()[0]
+
+    # ── 워커 측 ────────────────────────────────────────────────────────────────
+    def heartbeat(self, worker_id):
+        self.conn.execute("INSERT OR REPLACE INTO workers VALUES (?, ?)", (worker_id, time.time()))
+
+    def claim(self, worker_id, lease=LEASE_SEC):
+        now = time.time()
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            while True:
+                row = self.conn.execute("""
+                    SELECT job_id, unit_id, payload, attempts FROM tasks
+                    WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+                    ORDER BY created, unit_id LIMIT 1
+                """, (now,)).fetchone()
+                if row is None:
+                    return None
+                job_id, unit_id, payload, attempts = row
+                if attempts >= MAX_ATTEMPTS:
+                    self.conn.execute("UPDATE tasks SET status = 'failed', error = COALESCE(error, '임대 시간 초과') "
+                                      "WHERE job_id = ? AND unit_id = ?", (job_id, unit_id))
+                    continue
+                self.conn.execute("""
+                    UPDATE tasks SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1
+                    WHERE job_id = ? AND unit_id = ?
+                """, (worker_id, now + lease, job_id, unit_id))
+                return job_id, unit_id, unpack(payload)
+
+    def complete(self, job_id, unit_id, result):
+        self.conn.execute("UPDATE tasks SET status = 'done', result = ?, payload = NULL WHERE job_id = ? AND unit_id = ?",
+                          (pack(result), job_id, unit_id))
+
+    def fail(self, job_id, unit_id, error):
+        self.conn.execute("""
+            UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, error = ?
+            WHERE job_id = ? AND unit_id = ?
+        """, (MAX_ATTEMPTS, error, job_id, unit_id))
+
+
+# ===================================================================================================================
+# RedisBroker: 다중 호스트용 브로커 (Redis 호환 서버)
+# - dm:queue(대기 목록) → LMOVE → dm:running(처리 중 목록) + dm:lease:<task>(임대 키, TTL)
+#   (이동과 임대 키 설정은 Lua 스크립트로 원자적으로 처리 → reap()이 임대 전 작업을 되돌리지 않음)
+# - 임대 키가 만료된 running 작업은 reap()에서 대기 목록으로 되돌림 (워커/코디네이터 모두 호출)
+# - 작업 키에는 만료 시간을 두어, 삭제된 작업에 늦게 도착한 결과가 남지 않도록 함
+# ===================================================================================================================
+
+# KEYS: queue, running / ARGV: worker_id, lease, prefix
+CLAIM_LUA = """
+local tid = redis.call('LMOVE', KEYS[1], KEYS[2], 'RIGHT', 'LEFT')
+if not tid then return false end
+local task = ARGV[3] .. 'task:' .. tid
+if redis.call('EXISTS', task) == 0 then
+    redis.call('LREM', KEYS[2], 1, tid)
+    return false
+end
+redis.call('SET', ARGV[3] .. 'lease:' .. tid, ARGV[1], 'EX', ARGV[2])
+redis.call('HINCRBY', task, 'attempts', 1)
+redis.call('HSET', task, 'status', 'running', 'worker', ARGV[1])
+return {tid, redis.call('HGET', task, 'payload')}
+"""
+
+# KEYS: task / ARGV: result - 이미 삭제된 작업(delete_job)이면 기록하지 않음
+COMPLETE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], 'status', 'done', 'result', ARGV[1])
+redis.call('HDEL', KEYS[1], 'payload')
+return 1
+"""
+
+# KEYS: task, queue / ARGV: error, max_attempts, tid - 재시도 가능하면 대기 목록으로 되돌림
+FAIL_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+if tonumber(redis.call('HGET', KEYS[1], 'attempts') or '0') >= tonumber(ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'status', 'failed', 'error', ARGV[1])
+else
+    redis.call('HSET', KEYS[1], 'status', 'queued', 'error', ARGV[1])
+    redis.call('RPUSH', KEYS[2], ARGV[3])
+end
+return 1
+"""
+
+
+class RedisBroker:
+    PREFIX   = "dm:"
+    TASK_TTL = JOB_TIMEOUT + LEASE_SEC    # 작업 키 만료 (코디네이터 제한 시간 + 마지막 임대)
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("redis 패키지가 설치되어 있지 않습니다. (pip install redis)")
+        self.r         = redis.Redis.from_url(url)
+        self._claim    = self.r.register_script(CLAIM_LUA)
+        self._complete = self.r.register_script(COMPLETE_LUA)
+        self._fail     = self.r.register_script(FAIL_LUA)
+
+    def _k(self, *parts):
+        return self.PREFIX + ":".join(str(p) for p in parts)
+
+    @staticmethod
+    def _tid(job_id, unit_id):
+        return f"{job_id}|{unit_id}"
+
+    # ── 코디네이터 측 ──────────────────────────────────────────────────────────
+    def publish(self, job_id, units):
+        pipe = self.r.pipeline()
+        for unit_id, payload in units:
+            tid = self._tid(job_id, unit_id)
+            pipe.hset(self._k("task", tid), mapping={"payload": pack(payload), "status": "queued", "attempts": 0})
+            pipe.expire(self._k("task", tid), self.TASK_TTL)
+            pipe.sadd(self._k("job", job_id), unit_id)
+            pipe.lpush(self._k("queue"), tid)
+        pipe.expire(self._k("job", job_id), self.TASK_TTL)
+        pipe.execute()
+
+    def poll(self, job_id):
+        self.reap()
+        units = sorted(int(u) for u in self.r.smembers(self._k("job", job_id)))
+        pipe  = self.r.pipeline()
+        for unit_id in units:
+            pipe.hmget(self._k("task", self._tid(job_id, unit_id)), "status", "error")
+        out = {}
+        for unit_id, (status, error) in zip(units, pipe.execute()):
+            out[unit_id] = ((status or b"").decode(), error.decode() if error else None)
+        return out
+
+    def take_result(self, job_id, unit_id):
+        key  = self._k("task", self._tid(job_id, unit_id))
+        data = self.r.hget(key, "result")
+        self.r.hdel(key, "result")
+        self.r.hset(key, "status", "collected")
+        return unpack(data) if data is not None else None
+
+    def delete_job(self, job_id):
+        units = self.r.smembers(self._k("job", job_id))
+        pipe  = self.r.pipeline()
+        for unit_id in units:
+            tid = self._tid(job_id, int(unit_id))
+            pipe.delete(self._k("task", tid), self._k("lease", tid))
+            pipe.lrem(self._k("queue"), 0, tid)
+            pipe.lrem(self._k("running"), 0, tid)
+        pipe.delete(self._k("job", job_id))
+        pipe.execute()
+
+    def live_workers(self):
+        return sum(1 for _ in self.r.scan_iter(match=self._k("worker", "*")))
+
+    # ── 워커 측 ────────────────────────────────────────────────────────────────
+    def heartbeat(self, worker_id):
+        self.r.set(self._k("worker", worker_id), time.time(), ex=WORKER_TTL)
+
+    def reap(self):
+        for raw in self.r.lrange(self._k("running"), 0, -1):
+            tid = raw.decode()
+            if self.r.exists(self._k("lease", tid)):
+                continue
+            if self.r.lrem(self._k("running"), 1, tid):
+                key = self._k("task", tid)
+                if not self.r.exists(key):   # 이미 삭제된 작업
+                    continue
+                if int(self.r.hget(key, "attempts") or 0) >= MAX_ATTEMPTS:
+                    self.r.hset(key, mapping={"status": "failed", "error": "임대 시간 초과"})
+                else:
+                    self.r.hset(key, "status", "queued")
+                    self.r.rpush(self._k("queue"), tid)
+
+    def claim(self, worker_id, lease=LEASE_SEC):
+        self.reap()
+        task = self._claim(keys=[self._k("queue"), self._k("running")], args=[worker_id, lease, self.PREFIX])
+        if not task:
+            return None
+        tid, payload = task
+        job_id, unit_id = tid.decode().split("|")
+        return job_id, int(unit_id), unpack(payload)
+
+    def _release(self, job_id, unit_id):
+        tid = self._tid(job_id, unit_id)
+        self.r.lrem(self._k("running"), 1, tid)
+        self.r.delete(self._k("lease", tid))
+        return tid
+
+    def complete(self, job_id, unit_id, result):
+        tid = self._release(job_id, unit_id)
+        self._complete(keys=[self._k("task", tid)], args=[pack(result)])
+
+    def fail(self, job_id, unit_id, error):
+        tid = self._release(job_id, unit_id)
+        self._fail(keys=[self._k("task", tid), self._k("queue")], args=[error, MAX_ATTEMPTS, tid])
+
+
+# ===================================================================================================================
+# open_broker: URL로 브로커 생성
+# - sqlite:///상대경로.db, sqlite:////절대경로.db, redis://host:port/db
+# ===================================================================================================================
+
+def open_broker(url=BROKER_URL):
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        return SQLiteBroker(url[len("sqlite:///"):])
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisBroker(url)
+    raise ValueError(f"지원하지 않는 브로커 주소입니다: {url}")
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
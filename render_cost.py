@@ -0,0 +1,398 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import time
+import sqlite3
+import threading
+import statistics
+
+from pathlib import Path
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+DB_NAME          = "render_stats.db"
+HISTORY_LIMIT    = 500      # 모델 적합에 사용할 최근 샘플 수
+MIN_SAMPLES      = 5        # 이보다 적으면 사전값(PRIORS) 사용
+
+# 사전값: 이력이 쌓이기 전 기본 추정치 (절편, 기울기)
+# - tts    : 글자 수 → 음성 합성 시간(초)
+# - audio  : 글자 수 → 음성 길이(초)
+# - encode : 영상 길이(초) x 출력 형식 수 → 합성 + 인코딩 시간(초) (렌더링 방식별)
+PRIORS = {
+    "tts"            : (0.5, 0.08),
+    "audio"          : (0.0, 0.16),
+    "encode"         : (0.5, 0.60),
+    "encode_stream"  : (0.5, 0.60),
+    "encode_segment" : (1.0, 0.60),
+}
+
+# 렌더링 방식 → 인코딩 단계 이름
+# - batch  : 전체 타임라인 일괄 인코딩
+# - stream : 슬라이드 단위 단일 인코더 파이프
+# - segment: 슬라이드별 세그먼트 병렬 인코딩 (로컬 프로세스 풀)
+# - remote : 슬라이드별 세그먼트를 분산 워커가 인코딩 (코디네이터는 연결만 수행)
+ENCODE_STAGE = {"batch": "encode", "stream": "encode_stream", "segment": "encode_segment", "remote": "encode_segment"}
+
+# 메모리 사전값 (MB): 기본 + 방식별 단위당 (batch: 슬라이드, stream: 형식, segment: 병렬 작업 x 형식)
+MEM_BASE_MB      = 300
+MEM_PER_UNIT_MB  = {"batch": 40, "stream": 250, "segment": 250, "remote": 0}
+CPU_PER_RENDER   = 1.0      # Python 합성 1코어
+CPU_PER_FORMAT   = 0.5      # 형식별 ffmpeg 인코더
+CPU_REMOTE       = 0.2      # 분산 렌더링 시 코디네이터 부하 (대기 + 연결)
+CPU_PER_LANE     = 1.0      # 병렬 세그먼트 작업 프로세스 1개 (합성 + 인코딩을 순차 수행)
+
+# 수용 한도 (환경변수로 조정)
+MAX_CPU          = float(os.environ.get("RENDER_MAX_CPU", os.cpu_count() or 2))
+MAX_QUEUE        = int(os.environ.get("RENDER_MAX_QUEUE", "4"))
+QUEUE_TIMEOUT    = int(os.environ.get("RENDER_QUEUE_TIMEOUT", "600"))
+
+
+
+# ===================================================================================================================
+# 메모리 측정 유틸
+# ===================================================================================================================
+
+def _total_mem_mb():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 4096
+
+
+def _proc_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+# roots와 그 하위 프로세스 전체 (작업 프로세스가 띄운 ffmpeg 포함)
+def _process_tree(roots):
+    children = {}
+    try:
+        entries = [e for e in os.listdir("/proc") if e.isdigit()]
+    except OSError:
+        return list(roots)
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    out, stack = [], list(roots)
+    while stack:
+        pid = stack.pop()
+        out.append(pid)
+        stack.extend(children.get(pid, []))
+    return out
+
+
+# pids: 합산할 작업 프로세스 (세그먼트 풀 워커) - 앱의 다른 자식(soffice/unoserver 등)은 제외
+def rss_mb(pids=()):
+    total = _proc_rss_mb("self")
+    if pids:
+        total += sum(_proc_rss_mb(pid) for pid in _process_tree(pids))
+    return total
+
+
+MAX_MEM_MB = float(os.environ.get("RENDER_MAX_MEM_MB", int(_total_mem_mb() * 0.7)))
+
+
+def format_eta(seconds):
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}초"
+    m, s = divmod(seconds, 60)
+    if m < 60:
+        return f"{m}분 {s}초"
+    h, m = divmod(m, 60)
+    return f"{h}시간 {m}분"
+
+
+# ===================================================================================================================
+# fit_linear: 최소제곱 직선 적합 (y = a + b*x), 샘플 부족/퇴화 시 prior 반환
+# ===================================================================================================================
+
+def fit_linear(samples, prior):
+    if len(samples) < MIN_SAMPLES:
+        return prior
+    xs = [x for x, _ in samples]
+    ys = [y for _, y in samples]
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    if var <= 1e-9:
+        # x가 모두 같으면 원점 통과 비율로 적합
+        return (0.0, my / mx) if mx > 0 else prior
+    b = sum((x - mx) * (y - my) for x, y in samples) / var
+    a = my - b * mx
+    if b <= 0:
+        return prior
+    return (max(a, 0.0), b)
+
+
+# ===================================================================================================================
+# RenderStats: 단계별 소요 시간 / 작업별 메모리 이력 저장 (SQLite)
+# ===================================================================================================================
+
+class RenderStats:
+    def __init__(self, root):
+        Path(root).mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(Path(root) / DB_NAME), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stage_timings (ts REAL, stage TEXT, x REAL, y REAL);
+            CREATE TABLE IF NOT EXISTS job_stats (ts REAL, mode TEXT, slides INTEGER, formats INTEGER, parallel INTEGER,
+                                                  seconds REAL, peak_mem_mb REAL);
+            CREATE INDEX IF NOT EXISTS idx_stage_ts ON stage_timings (stage, ts);
+        """)
+        self._migrate()
+
+    # 이전 스키마(streaming 플래그) 이력 DB에 mode / parallel 컬럼 추가
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_stats)")}
+        with self._conn:
+            if "mode" not in columns:
+                self._conn.execute("ALTER TABLE job_stats ADD COLUMN mode TEXT")
+                if "streaming" in columns:
+                    self._conn.execute("UPDATE job_stats SET mode = CASE WHEN streaming THEN 'stream' ELSE 'batch' END")
+            if "parallel" not in columns:
+                self._conn.execute("ALTER TABLE job_stats ADD COLUMN parallel INTEGER NOT NULL DEFAULT 1")
+
+    def record_stage(self, stage, x, y):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO stage_timings VALUES (?, ?, ?, ?)", (time.time(), stage, x, y))
+
+    def record_job(self, mode, slides, formats, parallel, seconds, peak_mem_mb):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO job_stats (ts, mode, slides, formats, parallel, seconds, peak_mem_mb) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (time.time(), mode, slides, formats, parallel, seconds, peak_mem_mb))
+
+    def stage_samples(self, stage, limit=HISTORY_LIMIT):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT x, y FROM stage_timings WHERE stage = ? ORDER BY ts DESC LIMIT ?", (stage, limit)
+            ).fetchall()
+
+    def job_samples(self, mode, limit=HISTORY_LIMIT):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT slides, formats, parallel, peak_mem_mb FROM job_stats WHERE mode = ? ORDER BY ts DESC LIMIT ?",
+                (mode, limit)
+            ).fetchall()
+
+
+# ===================================================================================================================
+# CostModel: 이력 기반 렌더링 비용 모델
+# - 시간: 단계별 선형 모델 (tts, audio 길이, 방식별 encode)
+#   병렬 방식도 음성 합성은 앱에서 순차 실행되므로 인코딩 시간만 병렬도로 나눔: sum(tts) + sum(encode) / lanes
+# - 메모리: 방식별 단위(슬라이드 / 형식 / 병렬 작업 x 형식)당 이력 중앙값
+# - CPU: 렌더링 1건당 고정 + 출력 형식당 인코더 (병렬 방식은 앱 프로세스 + 작업 프로세스당 1코어)
+# ===================================================================================================================
+
+
+def _mem_units(mode, slides, formats, parallel):
+    if mode == "batch":
+        return max(slides, 1)
+    if mode == "segment":
+        return max(parallel, 1) * formats
+    return formats
+
+
+class CostModel:
+    def __init__(self, stats):
+        self.stats  = stats
+        self.coef   = dict(PRIORS)
+        self.mem    = dict(MEM_PER_UNIT_MB)
+        self.refit()
+
+    def refit(self):
+        for stage, prior in PRIORS.items():
+            self.coef[stage] = fit_linear(self.stats.stage_samples(stage), prior)
+        for mode in ("batch", "stream", "segment"):
+            rows = self.stats.job_samples(mode)
+            if len(rows) >= MIN_SAMPLES:
+                per_unit = [mem / _mem_units(mode, slides, fmts, par) for slides, fmts, par, mem in rows if mem > 0]
+                if per_unit:
+                    self.mem[mode] = statistics.median(per_unit)
+
+    def _predict(self, stage, x):
+        a, b = self.coef[stage]
+        return a + b * x
+
+    # 슬라이드 1장 예상 소요 시간 (초): (음성 합성, 합성 + 인코딩) - 병렬도 반영 전
+    def slide_parts(self, chars, mode, formats):
+        if chars <= 0:
+            return 0.0, 0.0
+        audio_sec = self._predict("audio", chars)
+        return self._predict("tts", chars), self._predict(ENCODE_STAGE[mode], audio_sec * formats)
+
+    # 수용 한도(CPU/메모리) 안에서 동시에 돌릴 수 있는 세그먼트 작업 수 (풀 크기 이하)
+    def segment_lanes(self, workers, formats, max_cpu=MAX_CPU, max_mem_mb=MAX_MEM_MB):
+        by_cpu = int((max_cpu - CPU_PER_RENDER) / CPU_PER_LANE)
+        by_mem = int((max_mem_mb - MEM_BASE_MB) / max(self.mem["segment"] * formats, 1))
+        return max(1, min(workers, by_cpu, by_mem))
+
+    # 슬라이드 1장이 전체 소요 시간에 기여하는 몫 (인코딩만 병렬도로 나눔)
+    def slide_seconds(self, chars, mode, formats, parallel=1):
+        tts, enc = self.slide_parts(chars, mode, formats)
+        return tts + enc / max(parallel, 1)
+
+    # 렌더링 작업 전체 예상치
+    def estimate(self, texts, mode, formats, parallel=1):
+        chars   = [len(t or "") for t in texts]
+        slides  = sum(1 for c in chars if c > 0)
+        seconds = sum(self.slide_seconds(c, mode, formats, parallel) for c in chars)
+        if mode == "remote":
+            cpu, mem = CPU_REMOTE, MEM_BASE_MB
+        else:
+            if mode == "segment":
+                cpu = CPU_PER_RENDER + CPU_PER_LANE * max(parallel, 1)
+            else:
+                cpu = CPU_PER_RENDER + CPU_PER_FORMAT * formats
+            mem   = MEM_BASE_MB + self.mem[mode] * _mem_units(mode, slides, formats, parallel)
+        return {'seconds': seconds, 'cpu': cpu, 'mem_mb': mem, 'slides': slides}
+
+
+# ===================================================================================================================
+# RenderTracker: 렌더링 1건의 단계별 실측 기록 + 남은 시간 추정
+# - record(): 단계 실측 샘플을 이력에 저장 (다음 모델 적합에 사용)
+# - remaining(): 남은 슬라이드 예측치 합 x (실측 / 예측) 보정 비율
+#   (병렬 방식은 완료 순서가 뒤섞이므로 남은 슬라이드 인덱스 목록을 직접 전달)
+# - tts_share: 전체 예측 시간 중 음성 합성 비중 (일괄 렌더링 진행률 구간 분할용)
+# ===================================================================================================================
+
+class RenderTracker:
+    def __init__(self, model, stats, texts, mode, formats, parallel=1, worker_pids=None):
+        parts          = [model.slide_parts(len(t or ""), mode, formats) for t in texts]
+        self.stats     = stats
+        self.mode      = mode
+        self.formats   = formats
+        self.parallel  = max(parallel, 1)
+        self.predicted = [tts + enc / self.parallel for tts, enc in parts]
+        total          = sum(self.predicted)
+        self.tts_share = sum(tts for tts, _ in parts) / total if total > 0 else 0.5
+        self.start     = time.time()
+        self.done_pred = 0.0
+        self.workers   = worker_pids    # 병렬 방식: 합성/인코딩을 실행하는 작업 프로세스 PID 목록 반환 함수
+        self.mem_start = self._rss()
+        self.peak_mem  = self.mem_start
+
+    def record(self, stage, x, y):
+        try:
+            self.stats.record_stage(stage, x, y)
+        except sqlite3.Error:
+            pass
+
+    def _rss(self):
+        return rss_mb(self.workers() if self.workers else ())
+
+    def sample_mem(self):
+        self.peak_mem = max(self.peak_mem, self._rss())
+
+    def slide_done(self, idx):
+        self.done_pred += self.predicted[idx]
+        self.sample_mem()
+
+    def remaining(self, pending):
+        if isinstance(pending, int):
+            pending = range(pending, len(self.predicted))
+        rest    = sum(self.predicted[i] for i in pending)
+        elapsed = time.time() - self.start
+        ratio   = elapsed / self.done_pred if self.done_pred > 0 else 1.0
+        return rest * ratio
+
+    def finish(self):
+        self.sample_mem()
+        slides = sum(1 for p in self.predicted if p > 0)
+        try:
+            self.stats.record_job(self.mode, slides, self.formats, self.parallel,
+                                  time.time() - self.start, self.peak_mem - self.mem_start)
+        except sqlite3.Error:
+            pass
+
+
+# ===================================================================================================================
+# Admission: 예측 CPU/메모리 부하 기반 렌더링 수용 제어 (프로세스 전역)
+# - 한도 내면 즉시 실행, 초과 시 대기열에서 대기 (QUEUE_TIMEOUT까지)
+# - 단독으로도 한도를 넘거나 대기열이 가득 차면 거절
+# ===================================================================================================================
+
+class RenderRejected(Exception):
+    pass
+
+
+class Admission:
+    def __init__(self, max_cpu=MAX_CPU, max_mem_mb=MAX_MEM_MB, max_queue=MAX_QUEUE, timeout=QUEUE_TIMEOUT):
+        self.max_cpu    = max_cpu
+        self.max_mem_mb = max_mem_mb
+        self.max_queue  = max_queue
+        self.timeout    = timeout
+        self._cond      = threading.Condition()
+        self._active    = {}            # ticket -> estimate
+        self._queue     = []            # 대기 중 ticket (FIFO)
+        self._next      = 0
+
+    def _load(self):
+        cpu = sum(e['cpu'] for e in self._active.values())
+        mem = sum(e['mem_mb'] for e in self._active.values())
+        return cpu, mem
+
+    def _fits(self, estimate):
+        cpu, mem = self._load()
+        return cpu + estimate['cpu'] <= self.max_cpu and mem + estimate['mem_mb'] <= self.max_mem_mb
+
+    # wait_cb(position): 대기 중 주기적으로 호출 (대기 순번 표시용)
+    def acquire(self, estimate, wait_cb=None):
+        if estimate['cpu'] > self.max_cpu or estimate['mem_mb'] > self.max_mem_mb:
+            raise RenderRejected(
+                f"예상 부하(CPU {estimate['cpu']:.1f}, 메모리 {estimate['mem_mb']:.0f}MB)가 서버 한도를 초과합니다. "
+                "스트리밍 렌더링을 사용하거나 출력 형식을 줄이세요."
+            )
+
+        with self._cond:
+            ticket = self._next
+            self._next += 1
+            if not self._queue and self._fits(estimate):
+                self._active[ticket] = estimate
+                return ticket
+            if len(self._queue) >= self.max_queue:
+                raise RenderRejected("렌더링 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+
+            self._queue.append(ticket)
+            deadline = time.time() + self.timeout
+            try:
+                while not (self._queue[0] == ticket and self._fits(estimate)):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise RenderRejected("렌더링 대기 시간이 초과되었습니다. 잠시 후 다시 시도하세요.")
+                    if wait_cb:
+                        wait_cb(self._queue.index(ticket) + 1)
+                    self._cond.wait(timeout=min(remaining, 2.0))
+                self._active[ticket] = estimate
+                return ticket
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self, ticket):
+        with self._cond:
+            self._active.pop(ticket, None)
+            self._cond.notify_all()
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,176 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import traceback
+
+from pathlib import Path
+from contextlib import contextmanager
+
+import render_broker
+import slide_composer
+import image_normalizer
+
+# [TTS] Qwen3-TTS Manager (미설치 워커는 Edge-TTS만 사용)
+try:
+    from tts_manager import TTSEngine
+except ImportError:
+    TTSEngine = None
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+IDLE_SLEEP    = 1.0                             # 대기 작업이 없을 때 폴링 간격 (초)
+HEARTBEAT_SEC = render_broker.WORKER_TTL / 3    # 작업 처리 중 하트비트 간격 (초)
+
+
+
+# ===================================================================================================================
+# load_tts_engine: 워커 프로세스당 1회 로드 (작업 간 재사용)
+# ===================================================================================================================
+
+def load_tts_engine():
+    if TTSEngine is None:
+        print("⚠️ tts_manager를 찾을 수 없습니다. Edge-TTS만 사용합니다.")
+        return None
+    try:
+        return TTSEngine(device="cpu")
+    except Exception as e:
+        print(f"⚠️ TTS 엔진 로드 실패 ({e}). Edge-TTS만 사용합니다.")
+        return None
+
+
+# ===================================================================================================================
+# process_unit: 슬라이드 1장 처리 (TTS 합성 + 형식별 세그먼트 인코딩)
+# - payload: {'text', 'image', 'image_ext', 'variants', 'formats', 'ref_audio', 'ref_audio_ext', 'ref_text'}
+# - 반환: {'duration', 'segments': {형식: mp4 bytes}, 'tts_sec', 'encode_sec', 'fallback'}
+# ===================================================================================================================
+
+def process_unit(tts_engine, payload, work_dir):
+    unit_dir = Path(tempfile.mkdtemp(dir=work_dir))
+    try:
+        image_path = unit_dir / f"slide{payload['image_ext']}"
+        image_path.write_bytes(payload['image'])
+        for tag, data in (payload.get('variants') or {}).items():
+            image_normalizer.variant_path(image_path, tag).write_bytes(data)
+
+        ref_audio_path = None
+        if payload.get('ref_audio'):
+            ref_audio_path = unit_dir / f"ref{payload['ref_audio_ext']}"
+            ref_audio_path.write_bytes(payload['ref_audio'])
+
+        # Step 1: TTS
+        t_start = time.time()
+        a_path  = unit_dir / "voice.wav"
+        created, used_fallback = slide_composer.synthesize_audio(
+            tts_engine, payload['text'], a_path,
+            str(ref_audio_path) if ref_audio_path else None,
+            payload.get('ref_text') if ref_audio_path else None
+        )
+        if not created:
+            raise RuntimeError("오디오 생성 실패")
+        tts_sec = time.time() - t_start
+
+        # Step 2: 형식별 세그먼트 인코딩
+        t_start  = time.time()
+        outputs  = {fmt: unit_dir / f"segment_{fmt.replace(':', 'x')}{slide_composer.SEGMENT_EXT}" for fmt in payload['formats']}
+        duration = slide_composer.encode_segment(image_path, payload['text'], a_path, outputs, unit_dir)
+        encode_sec = time.time() - t_start
+
+        return {
+            'duration'   : duration,
+            'segments'   : {fmt: path.read_bytes() for fmt, path in outputs.items()},
+            'tts_sec'    : tts_sec,
+            'encode_sec' : encode_sec,
+            'fallback'   : used_fallback,
+        }
+    finally:
+        shutil.rmtree(unit_dir, ignore_errors=True)
+
+
+# ===================================================================================================================
+# heartbeat: 작업 처리 중 백그라운드 스레드에서 하트비트 유지
+# - TTS/인코딩이 WORKER_TTL보다 길어도 코디네이터에 활성 워커로 표시
+# ===================================================================================================================
+
+@contextmanager
+def heartbeat(broker, worker_id):
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SEC):
+            try:
+                broker.heartbeat(worker_id)
+            except Exception as e:
+                print(f"⚠️ 하트비트 실패: {e}")
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+# ===================================================================================================================
+# run: 워커 메인 루프 (작업 선점 → 처리 → 결과 보고)
+# ===================================================================================================================
+
+def run(broker_url, work_dir, lease, once=False):
+    broker     = render_broker.open_broker(broker_url)
+    worker_id  = render_broker.worker_name()
+    tts_engine = load_tts_engine()
+    Path(work_dir).mkdir(parents=True, exist_ok=True)
+
+    print(f"🛠️ 렌더 워커 시작: {worker_id} (broker: {broker_url})")
+    while True:
+        broker.heartbeat(worker_id)
+        task = broker.claim(worker_id, lease)
+        if task is None:
+            if once:
+                return
+            time.sleep(IDLE_SLEEP)
+            continue
+
+        job_id, unit_id, payload = task
+        print(f"   - 작업 처리: {job_id} #{unit_id}")
+        try:
+            with heartbeat(broker, worker_id):
+                result = process_unit(tts_engine, payload, work_dir)
+            broker.complete(job_id, unit_id, result)
+        except Exception as e:
+            traceback.print_exc()
+            broker.fail(job_id, unit_id, f"{worker_id}: {e}")
+
+
+# ===================================================================================================================
+# 엔트리 포인트
+# - 예) python render_worker.py --broker sqlite:///broker/broker.db
+#       python render_worker.py --broker redis://redis-host:6379/0
+# ===================================================================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DocuMotion 분산 렌더 워커")
+    parser.add_argument("--broker", default=render_broker.BROKER_URL or "sqlite:///broker/broker.db",
+                        help="브로커 주소 (sqlite:///... 또는 redis://...)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "documotion_worker"),
+                        help="작업 임시 디렉토리")
+    parser.add_argument("--lease", type=int, default=render_broker.LEASE_SEC, help="작업 임대 시간 (초)")
+    parser.add_argument("--once", action="store_true", help="대기 작업을 모두 처리하면 종료")
+    args = parser.parse_args()
+
+    run(args.broker, args.work_dir, args.lease, args.once)
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
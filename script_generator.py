@@ -0,0 +1,281 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import io
+import re
+import json
+import time
+import hashlib
+import tempfile
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image
+
+from google import genai
+from google.genai import types
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+MODEL_NAME          = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+
+# 로컬 스텁 서버 등으로 API 엔드포인트 교체 (예: http://127.0.0.1:8080)
+BASE_URL            = os.environ.get("GEMINI_BASE_URL") or None
+
+# 배치 크기 산정용 한도 (모델 컨텍스트보다 보수적으로 설정)
+INPUT_TOKEN_BUDGET  = int(os.environ.get("GEMINI_INPUT_TOKENS", "200000"))   # 배치당 입력 토큰
+OUTPUT_TOKEN_LIMIT  = 8192                                                   # 배치당 출력 토큰 (모델 최대치)
+TOKENS_PER_IMAGE    = 1032      # 1024px 이미지 1장 추정치 (258 토큰 x 4 타일)
+TOKENS_PER_SCRIPT   = 600       # 슬라이드 1장 대본 출력 추정치
+CHARS_PER_TOKEN     = 2         # 한국어 혼합 텍스트 추정치
+PROMPT_TOKENS       = 2000      # 지시문 + 덱 개요 여유분
+
+MAX_CONCURRENCY     = int(os.environ.get("GEMINI_CONCURRENCY", "3"))        # 동시 배치 요청 수
+MAX_RETRIES         = 3
+IMAGE_MAX_SIDE      = 1024      # 전송 이미지 최대 변 길이
+
+# 대본 캐시 용량 / 보관 기간 한도
+CACHE_MAX_BYTES     = int(os.environ.get("SCRIPT_CACHE_MAX_MB", "64")) * 1024 * 1024
+CACHE_MAX_AGE_SEC   = int(os.environ.get("SCRIPT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+
+# 프롬프트가 바뀌면 올려서 캐시 무효화
+PROMPT_VERSION      = 1
+SYSTEM_PROMPT       = """당신은 기술 교육 영상의 전문 내레이터입니다.
+주어진 슬라이드 이미지와 추출 텍스트를 분석하여 각 슬라이드의 한국어 내레이션 대본을 작성하세요.
+- 슬라이드당 3~6문장, 자연스러운 구어체 존댓말
+- 앞뒤 슬라이드와 맥락이 이어지도록 작성 (덱 개요 참고)
+- 인용 표시, 마크다운, 이모지 없이 순수 문장만 작성
+- 응답은 {"슬라이드번호": "대본", ...} 형식의 JSON 객체 하나만 출력 (슬라이드번호는 요청에 표시된 번호 그대로)"""
+
+
+
+# ===================================================================================================================
+# 캐시: 슬라이드 이미지/텍스트 해시 → 대본 (슬라이드 1장당 JSON 파일 1개)
+# - 파일 mtime을 마지막 사용 시각으로 사용 (조회 시 갱신, LRU / 기간 만료 판단)
+# ===================================================================================================================
+
+def slide_key(image_path, text):
+    h = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        h.update(f.read())
+    h.update((text or "").encode("utf-8"))
+    h.update(f"{MODEL_NAME}|{PROMPT_VERSION}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ScriptCache:
+    def __init__(self, root, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE_SEC):
+        self.root      = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age   = max_age
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        path = self.root / f"{key}.json"
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                script = json.load(f)["script"]
+            os.utime(path)
+            return script
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, key, script):
+        fd, tmp = tempfile.mkstemp(prefix=f".{key}.", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"script": script, "created": time.time()}, f, ensure_ascii=False)
+            os.replace(tmp, self.root / f"{key}.json")
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+    # evict: 기간 만료 항목 삭제 후, 용량 초과 시 오래 안 쓴 순서로 삭제
+    def evict(self):
+        now     = time.time()
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# ===================================================================================================================
+# plan_batches: 토큰 추정치로 슬라이드를 배치로 분할
+# - 입력 토큰(이미지 + 텍스트)과 출력 토큰(대본) 한도를 모두 만족하도록 순서대로 채움
+# ===================================================================================================================
+
+def estimate_tokens(slide):
+    return TOKENS_PER_IMAGE + len(slide.get('extracted_text') or "") // CHARS_PER_TOKEN + 20
+
+
+def plan_batches(items, input_budget=INPUT_TOKEN_BUDGET, output_limit=OUTPUT_TOKEN_LIMIT):
+    max_per_batch = max(1, output_limit // TOKENS_PER_SCRIPT)
+    batches, current, used = [], [], PROMPT_TOKENS
+
+    for idx, slide in items:
+        cost = estimate_tokens(slide)
+        if current and (used + cost > input_budget or len(current) >= max_per_batch):
+            batches.append(current)
+            current, used = [], PROMPT_TOKENS
+        current.append((idx, slide))
+        used += cost
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ===================================================================================================================
+# 요청 구성 / 응답 파싱
+# ===================================================================================================================
+
+def _image_part(image_path):
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type="image/jpeg")
+
+
+def build_outline(slides, max_chars=60):
+    lines = []
+    for i, s in enumerate(slides):
+        first = (s.get('extracted_text') or "").strip().split("\n")[0][:max_chars]
+        lines.append(f"{i}: {first or s.get('label', '')}")
+    return "\n".join(lines)
+
+
+def _build_contents(batch, outline):
+    parts = [f"[덱 개요]\n{outline}\n\n아래 슬라이드들의 대본을 작성하세요."]
+    for idx, slide in batch:
+        parts.append(f"\n[슬라이드 {idx}]")
+        parts.append(_image_part(slide['path']))
+        text = (slide.get('extracted_text') or "").strip()
+        if text:
+            parts.append(f"추출 텍스트:\n{text}")
+    return parts
+
+
+def parse_response(text, expected):
+    clean = re.sub(r'\[cite.*?\]', '', text or "")                 # Gemini 인용 태그 제거
+    clean = re.sub(r'^```(?:json)?\s*|\s*```$', '', clean.strip())  # 코드 블록 제거
+    data  = json.loads(clean)
+    out   = {}
+    for k, v in data.items():
+        # 정수가 아닌 키 / 요청하지 않은 슬라이드는 건너뜀 (배치 전체를 실패 처리하지 않음)
+        try:
+            idx = int(str(k).strip())
+        except ValueError:
+            continue
+        if idx in expected and v is not None:
+            out[idx] = str(v).strip()
+    return out
+
+
+# ===================================================================================================================
+# ScriptGenerator: 배치 + 캐시 + 동시성 제한 대본 생성기
+# ===================================================================================================================
+
+class ScriptGenerator:
+    def __init__(self, api_key, cache_dir, base_url=BASE_URL, model=MODEL_NAME, concurrency=MAX_CONCURRENCY):
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client      = genai.Client(api_key=api_key, http_options=http_options)
+        self.model       = model
+        self.concurrency = max(1, concurrency)
+        self.cache       = ScriptCache(cache_dir)
+
+    def _request(self, batch, outline):
+        config = types.GenerateContentConfig(
+            system_instruction = SYSTEM_PROMPT,
+            response_mime_type = "application/json",
+            max_output_tokens  = OUTPUT_TOKEN_LIMIT,
+            temperature        = 0.4,
+        )
+        expected = {idx for idx, _ in batch}
+        last_err = None
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = self.client.models.generate_content(
+                    model    = self.model,
+                    contents = _build_contents(batch, outline),
+                    config   = config,
+                )
+                return parse_response(response.text, expected)
+            except Exception as e:
+                last_err = e
+                if attempt < MAX_RETRIES - 1:
+                    time.sleep(2 ** attempt)
+        raise last_err
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # generate: 슬라이드 리스트 → {인덱스: 대본}
+    # - slides: master_slides 형식 ({'path', 'extracted_text', 'label', ...})
+    # - only: 생성 대상 인덱스 (None이면 전체)
+    # - progress_cb(done, total): 슬라이드 단위 진행률
+    # - 실패한 배치는 건너뛰고 errors에 기록
+    # ─────────────────────────────────────────────────────────────────────────
+    def generate(self, slides, only=None, progress_cb=None):
+        targets = [i for i in range(len(slides)) if only is None or i in only]
+        results, errors, pending = {}, [], []
+
+        keys = {}
+        for i in targets:
+            keys[i] = slide_key(slides[i]['path'], slides[i].get('extracted_text'))
+            cached  = self.cache.get(keys[i])
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, slides[i]))
+
+        total = len(targets)
+        if progress_cb: progress_cb(len(results), total)
+        if not pending:
+            return results, errors
+
+        outline = build_outline(slides)
+        batches = plan_batches(pending)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._request, batch, outline): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    scripts = future.result()
+                except Exception as e:
+                    errors.append(f"슬라이드 {batch[0][0] + 1}~{batch[-1][0] + 1}: {e}")
+                    continue
+                for idx, script in scripts.items():
+                    self.cache.put(keys[idx], script)
+                    results[idx] = script
+                # 응답 JSON에서 빠진 슬라이드도 실패로 보고
+                missing = [idx for idx, _ in batch if idx not in scripts]
+                if missing:
+                    errors.append(f"슬라이드 {', '.join(str(idx + 1) for idx in missing)}: 응답에 대본이 없습니다.")
+                if progress_cb: progress_cb(len(results), total)
+
+        self.cache.evict()
+        return results, errors
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,265 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import re
+import time
+import asyncio
+import subprocess
+import numpy as np
+import edge_tts
+
+from pathlib import Path
+
+# [이미지] PIL - 이미지 처리 (moviepy 호환성 패치 포함)
+from PIL import Image
+if not hasattr(Image, 'ANTIALIAS'):
+    Image.ANTIALIAS = Image.LANCZOS  # PIL 10.0+ 버전 호환성
+
+import image_normalizer
+
+from moviepy.config import get_setting
+from moviepy.editor import ImageClip, AudioFileClip, TextClip, CompositeVideoClip, ColorClip
+
+
+# ===================================================================================================================
+# Global Variables
+# - Streamlit 앱(main.py)과 렌더 워커(render_worker.py)가 공유하는 슬라이드 합성 설정
+# ===================================================================================================================
+
+# [영상 렌더링 설정] 캔버스 크기, 폰트, 자막 스타일
+CANVAS_SIZE    = (1280, 720)             # 720p HD 해상도
+FONT_PATH      = "font.ttf"              # 자막용 폰트 파일 경로
+FONT_SIZE      = 28                      # 자막 폰트 크기 (px)
+TEXT_COLOR     = 'white'                 # 자막 텍스트 색상
+BG_COLOR       = (0, 0, 0)               # 배경색 (검정)
+FPS            = 24
+
+# [출력 형식] 한 번의 렌더링으로 여러 레이아웃 동시 출력 (TTS/자막 타이밍/이미지 디코딩 공유)
+# - image_box: 슬라이드 이미지가 들어갈 최대 영역, image_top: 이미지 상단 y
+# - subtitle_top: 자막 상단 y, subtitle_width: 자막 줄바꿈 폭
+OUTPUT_FORMATS = {
+    "16:9": {"size": CANVAS_SIZE, "suffix": "", "image_box": (CANVAS_SIZE[0], int(CANVAS_SIZE[1] * 0.85)), "image_top": 0,
+             "subtitle_top": CANVAS_SIZE[1] - 90, "subtitle_width": CANVAS_SIZE[0] - 100, "font_size": FONT_SIZE},
+    "9:16": {"size": (1080, 1920), "suffix": "_shorts", "image_box": (1080, 1100), "image_top": 420,
+             "subtitle_top": 1300, "subtitle_width": 960, "font_size": 46},
+}
+
+# [세그먼트 인코딩] 슬라이드별 세그먼트를 concat demuxer로 연결하려면 모든 세그먼트가 동일해야 함
+# - 음성은 PCM(mkv 컨테이너)으로 두고 연결 후 AAC로 1회 인코딩
+#   (세그먼트마다 AAC를 넣으면 인코더 프라이밍 샘플이 경계마다 끼어 무음 구간/싱크 밀림 발생)
+SEGMENT_EXT    = ".mkv"
+SEGMENT_PARAMS = {
+    "fps"           : FPS,
+    "codec"         : "libx264",
+    "preset"        : "medium",
+    "audio_codec"   : "pcm_s16le",
+    "audio_fps"     : 44100,
+    "ffmpeg_params" : ["-pix_fmt", "yuv420p", "-ac", "2"],
+}
+OUTPUT_AUDIO_BITRATE = "192k"
+
+# [병렬 세그먼트 인코딩] 로컬 프로세스 풀 크기 (기본: 코어 수 - 1, TTS/UI용 1코어 남김)
+SEGMENT_WORKERS = int(os.environ.get("RENDER_SEGMENT_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+
+
+# ===================================================================================================================
+# split_sentences: 텍스트를 문장 단위로 분리
+# - 정규식: 마침표/느낌표/물음표 뒤 공백 기준 분할
+# - 자막 타이밍 계산에 사용 (문장별 표시 시간 산출)
+# ===================================================================================================================
+
+def split_sentences(text):
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    return [s for s in sentences if s]
+
+
+# ===================================================================================================================
+# synthesize_audio: 대사 → 오디오 파일 (Qwen3-TTS, 실패 시 Edge-TTS)
+# - tts_engine이 None이면(워커에 Qwen3-TTS 미설치) 바로 Edge-TTS 사용
+# - 반환: (생성 여부, Edge-TTS 대체 사용 여부)
+# ===================================================================================================================
+
+def synthesize_audio(tts_engine, text, a_path, ref_audio_path=None, ref_text=None):
+    success = tts_engine is not None and tts_engine.generate(
+        text=text,
+        output_file=str(a_path),
+        ref_audio_path=ref_audio_path,
+        ref_text=ref_text
+    )
+
+    if not success:
+        # Qwen 실패 시 Edge-TTS로 대체 (Safety Net)
+        try:
+            asyncio.run(edge_tts.Communicate(text, "ko-KR-SunHiNeural").save(str(a_path)))
+        except Exception:
+            pass
+
+    return os.path.exists(str(a_path)), not success
+
+
+# ===================================================================================================================
+# subtitle_timing: 문장별 자막 표시 구간 계산 (글자 수 비례)
+# - 반환: [(문장, 시작, 길이), ...] - 출력 형식과 무관하므로 형식 간 공유
+# ===================================================================================================================
+
+def subtitle_timing(text, total_duration):
+    sentences     = split_sentences(text)
+    total_chars   = sum(len(s) for s in sentences)
+    timing        = []
+    current_start = 0
+
+    for s in sentences:
+        dur = (len(s) / total_chars) * total_duration if total_chars > 0 else total_duration
+        timing.append((s, current_start, dur))
+        current_start += dur
+    return timing
+
+
+# ===================================================================================================================
+# load_slide_image: 슬라이드 이미지 1회 디코딩 (RGB 배열) - 여러 출력 형식에서 공유
+# ===================================================================================================================
+
+def load_slide_image(path):
+    with Image.open(path) as img:
+        return np.array(img.convert("RGB"))
+
+
+# ===================================================================================================================
+# load_format_images: 출력 형식별 슬라이드 이미지 디코딩
+# - 업로드 시 형식별 크기로 저장된 변형 이미지가 있으면 사용 (없으면 기본 이미지 공유)
+# - 같은 파일은 1회만 디코딩
+# - 반환: {형식: RGB 배열}
+# ===================================================================================================================
+
+def load_format_images(path, formats):
+    decoded, images = {}, {}
+    for fmt in formats:
+        src = image_normalizer.format_image(path, fmt)
+        if src not in decoded:
+            decoded[src] = load_slide_image(src)
+        images[fmt] = decoded[src]
+    return images
+
+
+# ===================================================================================================================
+# build_slide_clip: 배경 + 이미지 + 문장별 자막 레이어 합성
+# - image: 파일 경로 또는 디코딩된 RGB 배열
+# - timing: subtitle_timing 결과 (없으면 text로 계산)
+# - layout: OUTPUT_FORMATS 항목 (기본 16:9)
+# - 반환: (합성 클립, 자막 클립 리스트) - 자막 클립은 호출 측에서 해제
+# ===================================================================================================================
+
+def build_slide_clip(image, text, total_duration, timing=None, layout=None):
+    layout = layout or OUTPUT_FORMATS["16:9"]
+    size   = layout["size"]
+
+    # Step 2: 문장 분리 및 자막 타이밍 계산 준비
+    if timing is None:
+        timing = subtitle_timing(text, total_duration)
+
+    # Step 3: 배경(검정) 및 이미지 클립 생성 (이미지 영역에 비율 유지하여 맞춤)
+    # - 업로드 시 렌더링 해상도로 정규화된 이미지는 크기가 이미 맞으므로 리사이즈 생략
+    bg_clip        = ColorClip(size=size, color=BG_COLOR).set_duration(total_duration)
+    img_clip       = ImageClip(image if isinstance(image, np.ndarray) else str(image))
+    box_w, box_h   = layout["image_box"]
+    if img_clip.w * box_h > img_clip.h * box_w:
+        if img_clip.w != box_w:
+            img_clip = img_clip.resize(width=box_w)
+    elif img_clip.h != box_h:
+        img_clip   = img_clip.resize(height=box_h)
+    img_clip       = img_clip.set_position(('center', layout["image_top"])).set_duration(total_duration)
+
+    # Step 4: 문장별 자막 클립 생성
+    subtitle_clips = []
+
+    for s, start, dur in timing:
+        txt_clip     = TextClip(
+            txt      = s,
+            font     = FONT_PATH,
+            fontsize = layout["font_size"],
+            color    = TEXT_COLOR,
+            size     = (layout["subtitle_width"], None),
+            method   = 'caption',
+            align    = 'center',
+            interline = 8
+        ).set_start(start).set_duration(dur).set_position(('center', layout["subtitle_top"]))
+        subtitle_clips.append(txt_clip)
+
+    # Step 5: 레이어 합성 (배경 → 이미지 → 자막)
+    return CompositeVideoClip([bg_clip, img_clip] + subtitle_clips, size=size), subtitle_clips
+
+
+# ===================================================================================================================
+# encode_segment: 슬라이드 1장을 독립 세그먼트(mkv, 영상 + PCM 음성)로 인코딩
+# - outputs: {형식: 출력 경로 (SEGMENT_EXT)} - 오디오/자막 타이밍은 형식 간 공유, 이미지는 형식별 변형 사용
+# - 모든 세그먼트가 SEGMENT_PARAMS로 인코딩되므로 concat_segments로 영상 재인코딩 없이 연결 가능
+# - 반환: 세그먼트 길이(초)
+# ===================================================================================================================
+
+def encode_segment(image, text, audio_path, outputs, temp_dir):
+    a_clip   = AudioFileClip(str(audio_path))
+    duration = a_clip.duration
+    timing   = subtitle_timing(text, duration)
+    images   = load_format_images(image, outputs)
+
+    try:
+        for fmt, out_path in outputs.items():
+            slide_clip, subtitle_clips = build_slide_clip(images[fmt], text, duration, timing, OUTPUT_FORMATS[fmt])
+            try:
+                slide_clip.set_audio(a_clip).write_videofile(
+                    str(out_path),
+                    temp_audiofile = str(Path(temp_dir) / f"{Path(out_path).stem}_TEMP_MPY.wav"),
+                    logger         = None,
+                    **SEGMENT_PARAMS
+                )
+            finally:
+                for c in subtitle_clips: c.close()
+                slide_clip.close()
+    finally:
+        a_clip.close()
+    return duration
+
+
+# ===================================================================================================================
+# encode_segment_task: 프로세스 풀 작업용 encode_segment 래퍼
+# - 반환: (세그먼트 길이, 인코딩 소요 시간) - 대기열 시간을 제외한 실측을 비용 모델에 기록하기 위함
+# ===================================================================================================================
+
+def encode_segment_task(image, text, audio_path, outputs, temp_dir):
+    t_start  = time.time()
+    duration = encode_segment(image, text, audio_path, outputs, temp_dir)
+    return duration, time.time() - t_start
+
+
+# ===================================================================================================================
+# concat_segments: 세그먼트 목록을 ffmpeg concat demuxer로 연결
+# - 영상은 무손실 복사(-c:v copy), PCM 음성은 이어 붙인 뒤 AAC로 1회 인코딩
+# - aresample async: 세그먼트 영상이 프레임 단위로 올림되어 생기는 음성 타임스탬프 틈을 무음으로 채워 싱크 유지
+# ===================================================================================================================
+
+def concat_segments(segment_paths, out_path, temp_dir):
+    list_path = Path(temp_dir) / f"{Path(out_path).stem}_segments.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for p in segment_paths:
+            f.write(f"file '{Path(p).resolve().as_posix()}'\n")
+
+    cmd = [
+        get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+        "-c:v", "copy", "-af", "aresample=async=1", "-c:a", "aac", "-b:a", OUTPUT_AUDIO_BITRATE,
+        "-movflags", "+faststart",
+        str(out_path),
+    ]
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    finally:
+        list_path.unlink(missing_ok=True)
+    return out_path
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,119 @@
+# ===================================================================================================================
+# Import
+# ===================================================================================================================
+
+import os
+import wave
+import subprocess
+
+from pathlib import Path
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+
+# ===================================================================================================================
+# Global Variables
+# ===================================================================================================================
+
+AUDIO_RATE      = 44100     # 슬라이드 오디오 정규화 샘플레이트
+AUDIO_CHANNELS  = 2
+AUDIO_BITRATE   = "192k"
+
+
+
+# ===================================================================================================================
+# normalize_audio: 슬라이드 오디오를 동일 포맷 PCM WAV로 변환
+# - TTS 엔진별 출력(wav/mp3)이 달라도 concat demuxer로 무손실 이어붙이기 가능
+# - 반환: 정확한 길이(초)
+# ===================================================================================================================
+
+def normalize_audio(src_path, dst_path):
+    cmd = [
+        get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+        "-i", str(src_path),
+        "-ar", str(AUDIO_RATE), "-ac", str(AUDIO_CHANNELS), "-c:a", "pcm_s16le",
+        str(dst_path),
+    ]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    with wave.open(str(dst_path), "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+# ===================================================================================================================
+# StreamingEncoder: 슬라이드를 하나씩 단일 ffmpeg 인코더 파이프로 흘려보내는 렌더러
+# - 영상: 상주 ffmpeg 프로세스 1개에 프레임을 순차 기록 (슬라이드 클립은 기록 직후 해제 가능)
+# - 오디오: 슬라이드별 정규화 WAV 목록만 보관 → 마지막에 concat + mux
+# - 프레임 수는 누적 타임라인 기준으로 계산하여 슬라이드가 많아도 A/V 싱크 오차가 1프레임 이내
+# ===================================================================================================================
+
+class StreamingEncoder:
+    def __init__(self, out_path, size, work_dir, fps=24, codec="libx264", preset="medium"):
+        self.out_path       = Path(out_path)
+        self.work_dir       = Path(work_dir)
+        self.fps            = fps
+        self.video_path     = self.work_dir / f"{self.out_path.stem}_stream_video.mp4"
+        self.list_path      = self.work_dir / f"{self.out_path.stem}_stream_audio.txt"
+        self.writer         = FFMPEG_VideoWriter(str(self.video_path), size, fps, codec=codec, preset=preset)
+        self.audio_files    = []
+        self.timeline       = 0.0
+        self.frames_written = 0
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # add_slide: 슬라이드 1개의 프레임 기록
+    # - clip: 합성된 슬라이드 클립 (오디오 불필요), audio_wav: normalize_audio 결과
+    # - progress_cb(frame_idx, total_frames): 슬라이드 내 진행률 콜백 (선택)
+    # ─────────────────────────────────────────────────────────────────────────
+    def add_slide(self, clip, audio_wav, duration, progress_cb=None):
+        self.timeline += duration
+        n_frames = int(round(self.timeline * self.fps)) - self.frames_written
+        last_t   = max(clip.duration - 1.0 / self.fps, 0)
+
+        for k in range(n_frames):
+            self.writer.write_frame(clip.get_frame(min(k / self.fps, last_t)))
+            if progress_cb and k % self.fps == 0:
+                progress_cb(k, n_frames)
+
+        self.frames_written += n_frames
+        self.audio_files.append(Path(audio_wav))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # finish: 인코더 종료 후 오디오 이어붙이기 + 영상과 mux (영상 재인코딩 없음)
+    # ─────────────────────────────────────────────────────────────────────────
+    def finish(self):
+        self.writer.close()
+
+        with open(self.list_path, "w", encoding="utf-8") as f:
+            for a in self.audio_files:
+                f.write(f"file '{a.resolve().as_posix()}'\n")
+
+        cmd = [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-i", str(self.video_path),
+            "-f", "concat", "-safe", "0", "-i", str(self.list_path),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac", "-b:a", AUDIO_BITRATE,
+            "-movflags", "+faststart",
+            str(self.out_path),
+        ]
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        finally:
+            self._cleanup()
+        return self.out_path
+
+    def abort(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+        self._cleanup()
+
+    def _cleanup(self):
+        for p in [self.video_path, self.list_path]:
+            if p.exists():
+                os.unlink(p)
+
+
+# ===================================================================================================================
+# End of program
+# ===================================================================================================================
@@ -0,0 +1,67 @@
+import pytest
+
+from render_cost import CostModel, RenderStats, RenderTracker
+
+
+# 합성 이력의 실제 단계 비용: 글자당 TTS 0.1초, 글자당 음성 0.2초, 음성 1초 x 형식당 인코딩 0.8초
+TTS_PER_CHAR   = 0.1
+AUDIO_PER_CHAR = 0.2
+ENC_PER_SEC    = 0.8
+TEXTS          = ["가" * n for n in (40, 80, 120, 60, 100, 90)]
+FORMATS        = 2
+
+
+def _slide_costs(chars):
+    return TTS_PER_CHAR * chars, ENC_PER_SEC * AUDIO_PER_CHAR * chars * FORMATS
+
+
+# 세그먼트 렌더링 실측 시간: 음성 합성은 순차, 인코딩만 lanes개 작업 프로세스에서 병렬
+def _wall_seconds(texts, lanes):
+    costs = [_slide_costs(len(t)) for t in texts]
+    return sum(tts for tts, _ in costs) + sum(enc for _, enc in costs) / lanes
+
+
+@pytest.fixture
+def stats(tmp_path):
+    stats = RenderStats(tmp_path)
+    # 1-lane / 4-lane 작업 이력: 단계 샘플은 슬라이드 단위라 병렬도와 무관하게 같은 값으로 쌓임
+    for lanes in (1, 4):
+        for text in TEXTS:
+            chars     = len(text)
+            tts, enc  = _slide_costs(chars)
+            stats.record_stage("tts", chars, tts)
+            stats.record_stage("audio", chars, AUDIO_PER_CHAR * chars)
+            stats.record_stage("encode_segment", AUDIO_PER_CHAR * chars * FORMATS, enc)
+        stats.record_job("segment", len(TEXTS), FORMATS, lanes, _wall_seconds(TEXTS, lanes), 500.0)
+    return stats
+
+
+@pytest.mark.parametrize("lanes", [1, 4])
+def test_segment_estimate_matches_history(stats, lanes):
+    model    = CostModel(stats)
+    estimate = model.estimate(TEXTS, "segment", FORMATS, lanes)
+    assert estimate['seconds'] == pytest.approx(_wall_seconds(TEXTS, lanes), rel=1e-6)
+
+
+def test_segment_estimate_does_not_parallelize_tts(stats):
+    model    = CostModel(stats)
+    one      = model.estimate(TEXTS, "segment", FORMATS, 1)['seconds']
+    many     = model.estimate(TEXTS, "segment", FORMATS, 4)['seconds']
+    tts_only = sum(TTS_PER_CHAR * len(t) for t in TEXTS)
+    assert tts_only < many < one
+    assert many > one / 4
+
+
+def test_tracker_matches_estimate(stats):
+    model    = CostModel(stats)
+    tracker  = RenderTracker(model, stats, TEXTS, "segment", FORMATS, 4)
+    estimate = model.estimate(TEXTS, "segment", FORMATS, 4)
+    tts_only = sum(TTS_PER_CHAR * len(t) for t in TEXTS)
+    assert sum(tracker.predicted) == pytest.approx(estimate['seconds'])
+    assert tracker.tts_share == pytest.approx(tts_only / estimate['seconds'])
+
+
+def test_stream_estimate_is_sequential(stats):
+    model = CostModel(stats)
+    assert model.estimate(TEXTS, "stream", FORMATS)['seconds'] == pytest.approx(
+        sum(sum(model.slide_parts(len(t), "stream", FORMATS)) for t in TEXTS))
@@ -0,0 +1,146 @@
+import re
+import json
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("google.genai")
+Image = pytest.importorskip("PIL.Image")
+
+import script_generator
+from script_generator import parse_response, plan_batches, estimate_tokens
+
+
+# ===================================================================================================================
+# plan_batches
+# ===================================================================================================================
+
+def _slides(n, text="짧은 텍스트"):
+    return [(i, {'path': f"s{i}.png", 'extracted_text': text}) for i in range(n)]
+
+
+def test_plan_batches_caps_scripts_per_batch():
+    per_batch = script_generator.OUTPUT_TOKEN_LIMIT // script_generator.TOKENS_PER_SCRIPT
+    batches   = plan_batches(_slides(per_batch * 2 + 3))
+    assert [len(b) for b in batches] == [per_batch, per_batch, 3]
+
+
+def test_plan_batches_respects_input_budget():
+    items  = _slides(5)
+    cost   = estimate_tokens(items[0][1])
+    budget = script_generator.PROMPT_TOKENS + cost * 2
+    assert [len(b) for b in plan_batches(items, input_budget=budget)] == [2, 2, 1]
+
+
+def test_plan_batches_keeps_order_and_oversized_slides():
+    items    = _slides(3)
+    items[1] = (1, {'path': "big.png", 'extracted_text': "가" * 100000})
+    batches  = plan_batches(items, input_budget=script_generator.PROMPT_TOKENS + 5000)
+    assert [[idx for idx, _ in b] for b in batches] == [[0], [1], [2]]
+
+
+# ===================================================================================================================
+# parse_response
+# ===================================================================================================================
+
+def test_parse_response_strips_fences_and_cites():
+    text = '```json\n{"3": "첫 대본입니다.[cite: 1]", "4": " 둘째 대본 "}\n```'
+    assert parse_response(text, {3, 4}) == {3: "첫 대본입니다.", 4: "둘째 대본"}
+
+
+def test_parse_response_drops_extra_and_bad_indices():
+    text = json.dumps({"1": "a", "9": "요청 안 한 슬라이드", "개요": "x", " 2 ": "b", "3": None})
+    assert parse_response(text, {1, 2, 3}) == {1: "a", 2: "b"}
+
+
+def test_parse_response_missing_indices_are_absent():
+    assert parse_response('{"5": "only"}', {5, 6, 7}) == {5: "only"}
+
+
+def test_parse_response_rejects_non_json():
+    with pytest.raises(ValueError):
+        parse_response("대본을 생성할 수 없습니다.", {0})
+
+
+# ===================================================================================================================
+# ScriptGenerator: GEMINI_BASE_URL로 지정하는 로컬 스텁 서버 대상 end-to-end
+# - 스텁은 요청에 표시된 [슬라이드 N] 번호마다 대본을 돌려주되 skip 번호는 빠뜨림
+# ===================================================================================================================
+
+def _strings(node):
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for v in node.values():
+            yield from _strings(v)
+    elif isinstance(node, list):
+        for v in node:
+            yield from _strings(v)
+
+
+class _StubGemini(BaseHTTPRequestHandler):
+    requests = []
+    skip     = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        idxs = [int(m) for s in _strings(body) for m in re.findall(r"\[슬라이드 (\d+)\]", s)]
+        type(self).requests.append((self.path, idxs))
+
+        scripts = {str(i): f"슬라이드 {i} 대본입니다." for i in idxs if i not in self.skip}
+        payload = json.dumps({
+            "candidates": [{
+                "content"      : {"role": "model", "parts": [{"text": json.dumps(scripts, ensure_ascii=False)}]},
+                "finishReason" : "STOP",
+            }],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubGemini.requests = []
+    _StubGemini.skip     = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGemini)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _deck(tmp_path, n):
+    slides = []
+    for i in range(n):
+        path = tmp_path / f"s{i}.png"
+        Image.new("RGB", (64, 36), (i * 20, 0, 0)).save(path)
+        slides.append({'path': str(path), 'extracted_text': f"슬라이드 {i} 본문", 'label': f"s{i}"})
+    return slides
+
+
+def test_generate_against_stub_server(tmp_path, stub_server):
+    _StubGemini.skip = {2}
+    slides    = _deck(tmp_path, 4)
+    generator = script_generator.ScriptGenerator("test-key", tmp_path / "cache", base_url=stub_server)
+
+    results, errors = generator.generate(slides)
+    assert results == {i: f"슬라이드 {i} 대본입니다." for i in (0, 1, 3)}
+    assert errors == ["슬라이드 3: 응답에 대본이 없습니다."]
+    assert all(path.endswith(":generateContent") for path, _ in _StubGemini.requests)
+    assert sorted(i for _, idxs in _StubGemini.requests for i in idxs) == [0, 1, 2, 3]
+
+    # 캐시된 슬라이드는 다시 요청하지 않음 (빠졌던 슬라이드만 재요청)
+    _StubGemini.requests, _StubGemini.skip = [], set()
+    results, errors = generator.generate(slides)
+    assert errors == []
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [idxs for _, idxs in _StubGemini.requests] == [[2]]